@@ -16,8 +16,11 @@ Usage:
 import argparse
 import os
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
@@ -25,17 +28,25 @@ load_dotenv()
 
 from src.config_loader import load_config
 from src.database import PaperDatabase
-from src.sources import PubMedClient, BioRxivClient
 
+# Number of search queries to run concurrently
+SEARCH_WORKERS = 4
 
-def format_paper_output(paper, config, is_new: bool = True, show_ranking: bool = False) -> str:
-    """Format a paper for terminal output."""
+SEPARATOR = "=" * 80
+
+
+def format_paper_output(
+    paper, config, is_new: bool = True, show_ranking: bool = False,
+    matched_projects: Optional[list[str]] = None,
+) -> str:
+    """Format a paper for terminal output (matched_projects: precomputed project matches)."""
     lines = []
-    lines.append(f"\n{'='*80}")
+    lines.append("\n" + SEPARATOR)
 
     # Status prefix
     if show_ranking and paper.relevance_score is not None:
-        score_bar = "█" * int(paper.relevance_score * 10) + "░" * (10 - int(paper.relevance_score * 10))
+        filled = int(paper.relevance_score * 10)
+        score_bar = "█" * filled + "░" * (10 - filled)
         status = f"[{score_bar} {paper.relevance_score:.2f}] "
     elif is_new:
         status = "[NEW] "
@@ -43,21 +54,18 @@ def format_paper_output(paper, config, is_new: bool = True, show_ranking: bool =
         status = "[SEEN] "
 
     lines.append(f"{status}TITLE: {paper.title}")
-    lines.append(f"{'='*80}")
+    lines.append(SEPARATOR)
 
     # Authors (truncate if many)
-    if len(paper.authors) > 5:
-        author_str = ", ".join(paper.authors[:5]) + f" ... (+{len(paper.authors)-5} more)"
+    n_authors = len(paper.authors)
+    if n_authors > 5:
+        author_str = ", ".join(paper.authors[:5]) + f" ... (+{n_authors - 5} more)"
     else:
         author_str = ", ".join(paper.authors) if paper.authors else "No authors listed"
     lines.append(f"Authors: {author_str}")
 
     # Check for watched authors
-    watched = []
-    for author in paper.authors:
-        for watched_author in config.watched_authors:
-            if watched_author.lower() in author.lower():
-                watched.append(author)
+    watched = config.match_watched_authors(paper.authors)
     if watched:
         lines.append(f"  ** WATCHED AUTHOR(S): {', '.join(watched)} **")
 
@@ -86,58 +94,84 @@ def format_paper_output(paper, config, is_new: bool = True, show_ranking: bool =
         lines.append(f"  Rationale: {paper.ranking_rationale}")
         lines.append(f"\nSummary: {paper.summary}")
     else:
-        # Check project matches using config
-        text = f"{paper.title} {paper.abstract}"
-        matched_projects = config.match_projects(text)
+        # Check project matches using config (unless the caller already did)
+        if matched_projects is None:
+            matched_projects = config.match_projects(paper.text_lower, already_lower=True)
         if matched_projects:
             lines.append(f"Matched projects: {', '.join(matched_projects)}")
 
         # Abstract (truncated)
         lines.append(f"\nAbstract:")
         if paper.abstract:
-            abstract = paper.abstract[:500]
             if len(paper.abstract) > 500:
-                abstract += "..."
-            lines.append(abstract)
+                lines.append(paper.abstract[:500] + "...")
+            else:
+                lines.append(paper.abstract)
         else:
             lines.append("  [No abstract available]")
 
     return "\n".join(lines)
 
 
-def run_search(config, args, db: PaperDatabase | None = None):
-    """Run the search phase and display results."""
-    print("\n" + "="*80)
+def run_search(config, args, db: Optional[PaperDatabase] = None):
+    """
+    Run the search phase and display results.
+
+    Returns:
+        Tuple of (all papers, new papers, {paper_id: matched project names}).
+    """
+    print("\n" + SEPARATOR)
     print("LITERATURE MONITOR - Search Results")
     print(f"Date: {datetime.now():%Y-%m-%d %H:%M}")
-    print("="*80)
+    print(SEPARATOR)
+
+    from src.sources import PubMedClient, BioRxivClient
 
     # Initialize clients
     pubmed = PubMedClient()
     biorxiv = BioRxivClient(include_medrxiv=True)
 
-    all_papers = []
-    seen_ids = set()  # Track duplicates within this search
+    # Queries are network-bound, so issue them concurrently. Each client's
+    # rate limiter is shared across threads to keep within API limits.
+    # PubMed queries only run ESearch here; metadata for the union of
+    # PMIDs is fetched afterwards in shared EFetch batches.
+    with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as executor:
+        pubmed_futures = [
+            executor.submit(
+                pubmed.search,
+                query,
+                max_results=config.max_results_per_query,
+                days_back=config.days_lookback,
+            )
+            for query in config.search_queries
+        ]
+        biorxiv_futures = [] if args.pubmed_only else [
+            executor.submit(
+                biorxiv.search_and_fetch,
+                query,
+                max_results=config.max_results_per_query,
+                days_back=config.days_lookback,
+            )
+            for query in config.search_queries
+        ]
+
+    # Deduplicate across queries with insertion-ordered dicts keyed by ID,
+    # which serve as both the membership test and the ordered result
+    pmids = {}
+    biorxiv_papers = {}
 
-    # Search each query
-    for query in config.search_queries:
+    # Report results in query order
+    for i, query in enumerate(config.search_queries):
         print(f"\n>> Searching: \"{query}\"")
 
         # PubMed
         print("  Querying PubMed...")
         try:
-            pubmed_papers = pubmed.search_and_fetch(
-                query,
-                max_results=config.max_results_per_query,
-                days_back=config.days_lookback,
-            )
-            new_count = 0
-            for paper in pubmed_papers:
-                if paper.id not in seen_ids:
-                    seen_ids.add(paper.id)
-                    all_papers.append(paper)
-                    new_count += 1
-            print(f"    Found {len(pubmed_papers)} papers ({new_count} unique)")
+            query_pmids = pubmed_futures[i].result()
+            before = len(pmids)
+            pmids.update(dict.fromkeys(query_pmids))
+            new_count = len(pmids) - before
+            print(f"    Found {len(query_pmids)} papers ({new_count} unique)")
         except Exception as e:
             print(f"    Error searching PubMed: {e}")
 
@@ -145,74 +179,91 @@ def run_search(config, args, db: PaperDatabase | None = None):
         if not args.pubmed_only:
             print("  Querying bioRxiv/medRxiv...")
             try:
-                biorxiv_papers = biorxiv.search_and_fetch(
-                    query,
-                    max_results=config.max_results_per_query,
-                    days_back=config.days_lookback,
-                )
-                new_count = 0
-                for paper in biorxiv_papers:
-                    if paper.id not in seen_ids:
-                        seen_ids.add(paper.id)
-                        all_papers.append(paper)
-                        new_count += 1
-                print(f"    Found {len(biorxiv_papers)} papers ({new_count} unique)")
+                query_papers = biorxiv_futures[i].result()
+                before = len(biorxiv_papers)
+                for paper in query_papers:
+                    biorxiv_papers.setdefault(paper.id, paper)
+                new_count = len(biorxiv_papers) - before
+                print(f"    Found {len(query_papers)} papers ({new_count} unique)")
             except Exception as e:
                 print(f"    Error searching bioRxiv: {e}")
 
+    pubmed_papers = []
+    if pmids:
+        print(f"\n>> Fetching PubMed metadata for {len(pmids)} unique papers...")
+        try:
+            pubmed_papers = pubmed.fetch_papers(list(pmids))
+        except Exception as e:
+            print(f"    Error fetching PubMed metadata: {e}")
+
+    all_papers = pubmed_papers + list(biorxiv_papers.values())
+
     # Check which papers are already in database
     existing_ids = set()
     if db and not args.dry_run:
         existing_ids = db.get_existing_ids([p.id for p in all_papers])
 
-    new_papers = [p for p in all_papers if p.id not in existing_ids]
+    # Tally everything the summary needs in a single pass over the results
+    new_papers = []
+    project_matches = {}
+    source_counts = Counter()
+    papers_with_watched = 0
+    papers_with_projects = 0
+    check_watched = bool(config.watched_authors)
+    check_projects = bool(config.active_projects)
+    for paper in all_papers:
+        if paper.id not in existing_ids:
+            new_papers.append(paper)
+        source_counts[paper.source] += 1
+        if check_watched and config.match_watched_authors(paper.authors):
+            papers_with_watched += 1
+        # Keep the matches so display and high-priority counting don't
+        # recompute them
+        matched = (
+            config.match_projects(paper.text_lower, already_lower=True)
+            if check_projects else []
+        )
+        project_matches[paper.id] = matched
+        if matched:
+            papers_with_projects += 1
 
     # Summary
-    print(f"\n{'='*80}")
+    print("\n" + SEPARATOR)
     print(f"SEARCH SUMMARY")
-    print(f"{'='*80}")
+    print(SEPARATOR)
     print(f"Total unique papers found: {len(all_papers)}")
-    print(f"  - PubMed: {sum(1 for p in all_papers if p.source == 'pubmed')}")
-    print(f"  - bioRxiv: {sum(1 for p in all_papers if p.source == 'biorxiv')}")
-    print(f"  - medRxiv: {sum(1 for p in all_papers if p.source == 'medrxiv')}")
+    print(f"  - PubMed: {source_counts['pubmed']}")
+    print(f"  - bioRxiv: {source_counts['biorxiv']}")
+    print(f"  - medRxiv: {source_counts['medrxiv']}")
 
     if db and not args.dry_run:
         print(f"New papers (not in database): {len(new_papers)}")
         print(f"Already seen: {len(existing_ids)}")
 
-    # Count papers with watched authors
-    papers_with_watched = 0
-    for paper in all_papers:
-        for author in paper.authors:
-            if any(wa.lower() in author.lower() for wa in config.watched_authors):
-                papers_with_watched += 1
-                break
     print(f"Papers with watched authors: {papers_with_watched}")
-
-    # Count papers matching projects
-    papers_with_projects = 0
-    for paper in all_papers:
-        text = f"{paper.title} {paper.abstract}"
-        if config.match_projects(text):
-            papers_with_projects += 1
     print(f"Papers matching active projects: {papers_with_projects}")
 
     # Display papers (prioritize new ones)
     display_papers = new_papers if new_papers else all_papers
     if args.verbose or len(display_papers) <= 10:
-        print(f"\n{'='*80}")
+        print("\n" + SEPARATOR)
         print("PAPERS" + (" (showing new only)" if new_papers and not args.verbose else ""))
-        print(f"{'='*80}")
-        for paper in display_papers:
-            is_new = paper.id not in existing_ids
-            print(format_paper_output(paper, config, is_new=is_new))
+        print(SEPARATOR)
     else:
         print(f"\n(Showing first 10 of {len(display_papers)} papers. Use --verbose to see all)")
-        for paper in display_papers[:10]:
-            is_new = paper.id not in existing_ids
-            print(format_paper_output(paper, config, is_new=is_new))
+        display_papers = display_papers[:10]
+
+    # Format everything up front and emit it with a single write
+    sys.stdout.write("".join(
+        format_paper_output(
+            paper, config,
+            is_new=paper.id not in existing_ids,
+            matched_projects=project_matches[paper.id],
+        ) + "\n"
+        for paper in display_papers
+    ))
 
-    return all_papers, new_papers
+    return all_papers, new_papers, project_matches
 
 
 def run_ranking(config, db: PaperDatabase, papers_to_rank: list = None, limit: int = None):
@@ -232,16 +283,16 @@ def run_ranking(config, db: PaperDatabase, papers_to_rank: list = None, limit: i
         print(f"Limiting to {limit} papers (of {len(papers_to_rank)} unranked)")
         papers_to_rank = papers_to_rank[:limit]
 
-    print(f"\n{'='*80}")
+    print("\n" + SEPARATOR)
     print("RANKING PAPERS WITH CLAUDE")
-    print(f"{'='*80}")
+    print(SEPARATOR)
 
     results = rank_and_update_db(papers_to_rank, config, db, verbose=True)
 
     # Display top results
-    print(f"\n{'='*80}")
+    print("\n" + SEPARATOR)
     print("TOP RANKED PAPERS")
-    print(f"{'='*80}")
+    print(SEPARATOR)
 
     high_priority = [(p, r) for p, r in results if r.relevance_score >= 0.7]
     moderate = [(p, r) for p, r in results if 0.4 <= r.relevance_score < 0.7]
@@ -269,9 +320,9 @@ def run_ranking(config, db: PaperDatabase, papers_to_rank: list = None, limit: i
 def show_stats(db: PaperDatabase):
     """Display database statistics."""
     stats = db.get_stats()
-    print("\n" + "="*80)
+    print("\n" + SEPARATOR)
     print("DATABASE STATISTICS")
-    print("="*80)
+    print(SEPARATOR)
     print(f"Total papers: {stats['total_papers']}")
     print(f"By source:")
     for source, count in stats.get('by_source', {}).items():
@@ -300,12 +351,14 @@ def show_ranked_papers(config, db: PaperDatabase, min_score: float = 0.0, limit:
     ranked = [p for p in papers if p.relevance_score is not None]
     ranked.sort(key=lambda p: p.relevance_score or 0, reverse=True)
 
-    print(f"\n{'='*80}")
+    print("\n" + SEPARATOR)
     print(f"TOP RANKED PAPERS (last 30 days, score >= {min_score})")
-    print(f"{'='*80}")
+    print(SEPARATOR)
 
-    for paper in ranked[:limit]:
-        print(format_paper_output(paper, config, is_new=False, show_ranking=True))
+    sys.stdout.write("".join(
+        format_paper_output(paper, config, is_new=False, show_ranking=True) + "\n"
+        for paper in ranked[:limit]
+    ))
 
 
 def main():
@@ -409,6 +462,11 @@ def main():
         action="store_true",
         help="Generate config suggestions based on feedback",
     )
+    parser.add_argument(
+        "--repair-suggestions",
+        action="store_true",
+        help="Re-parse stored Claude responses from failed --suggest-config runs",
+    )
     parser.add_argument(
         "--sync-zotero",
         action="store_true",
@@ -452,7 +510,7 @@ def main():
     if args.add_seed:
         from src.paper_lookup import lookup_paper
         print(f"Looking up: {args.add_seed}")
-        paper, source = lookup_paper(args.add_seed)
+        paper, source = lookup_paper(args.add_seed, db=db)
         if paper:
             is_new = db.insert_seed_paper(paper, source=source)
             print(f"{'Added' if is_new else 'Updated'} seed paper: {paper.title}")
@@ -508,7 +566,10 @@ def main():
         config = load_config(args.config)
         from src.config_suggester import generate_suggestions
         suggestions = generate_suggestions(config, db)
-        if suggestions:
+        if suggestions is None:
+            print("Config and feedback unchanged since the last suggestion run; "
+                  "no new suggestions (see the web UI for earlier ones).")
+        elif suggestions:
             print(f"\nGenerated {len(suggestions)} suggestions:")
             for s in suggestions:
                 print(f"  [{s['suggestion_type']}] {s['suggestion_text']}")
@@ -517,6 +578,18 @@ def main():
             print("No suggestions generated (need at least 5 starred papers).")
         return
 
+    # Repair suggestions from responses that failed to parse
+    if args.repair_suggestions:
+        from src.config_suggester import repair_suggestions
+        suggestions = repair_suggestions(db)
+        if suggestions:
+            print(f"\nRecovered {len(suggestions)} suggestions:")
+            for s in suggestions:
+                print(f"  [{s['suggestion_type']}] {s['suggestion_text']}")
+        else:
+            print("No suggestions recovered from failed runs.")
+        return
+
     # Sync Zotero library
     if args.sync_zotero:
         from src.zotero_sync import sync_zotero_library
@@ -580,13 +653,13 @@ def main():
         config.days_lookback = args.days
 
     # Run search
-    all_papers, new_papers = run_search(config, args, db=db)
+    all_papers, new_papers, project_matches = run_search(config, args, db=db)
 
     # Save to database
     if not args.dry_run and not args.search_only:
-        print(f"\n{'='*80}")
+        print("\n" + SEPARATOR)
         print("SAVING TO DATABASE")
-        print(f"{'='*80}")
+        print(SEPARATOR)
 
         total, inserted = db.insert_papers(all_papers)
         print(f"Inserted {inserted} new papers (of {total} found)")
@@ -594,11 +667,8 @@ def main():
         # Record the search run
         high_priority = sum(
             1 for p in new_papers
-            if any(
-                wa.lower() in a.lower()
-                for a in p.authors
-                for wa in config.watched_authors
-            ) or config.match_projects(f"{p.title} {p.abstract}")
+            if config.match_watched_authors(p.authors)
+            or project_matches.get(p.id)
         )
         run_id = db.record_search_run(
             papers_found=total,
@@ -617,9 +687,8 @@ def main():
 
     # Run ranking on new papers
     if not args.skip_ranking and new_papers:
-        # Re-fetch from database to get proper Paper objects
-        papers_to_rank = [db.get_paper(p.id) for p in new_papers]
-        papers_to_rank = [p for p in papers_to_rank if p is not None]
+        # Re-fetch from database (one query) to get proper Paper objects
+        papers_to_rank = db.get_papers([p.id for p in new_papers])
         run_ranking(config, db, papers_to_rank=papers_to_rank, limit=args.rank_limit)
     elif args.skip_ranking:
         print("\n[--skip-ranking mode, skipping Claude ranking]")
@@ -3,13 +3,55 @@ Config loader for literature monitoring tool.
 Loads and validates YAML configuration files.
 """
 
+import copy
 import os
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
 import yaml
 
+from . import fastjson
+
+# Prefer libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Suffix of the on-disk cache of parsed YAML written next to the config file
+CACHE_SUFFIX = ".cache.json"
+
+# Parsed YAML keyed by path, stored with the file's (mtime_ns, size) signature
+_raw_config_cache: dict[Path, tuple[tuple[int, int], dict]] = {}
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """
+    Build a regex alternation of `words` with shared prefixes factored out.
+
+    ["smith j", "smith jr", "sokol"] becomes "s(?:mith\\ j(?:r)?|okol)", so the
+    regex engine walks a prefix trie instead of retrying each alternative.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}  # End-of-word marker
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return emit(trie)
+
 
 @dataclass
 class Project:
@@ -40,12 +82,40 @@ class Config:
     days_lookback: int = 7
     min_relevance_score: float = 0.3
 
-    def get_journal_weight(self, journal_name: str) -> float:
-        """Get the weight multiplier for a journal (default 1.0 if not configured)."""
+    # Lookup tables, built once in __post_init__
+    _project_patterns: list[tuple[str, re.Pattern]] = field(
+        init=False, repr=False, default_factory=list
+    )
+    _watched_re: Optional[re.Pattern] = field(init=False, repr=False, default=None)
+    _journal_weight_map: dict[str, float] = field(init=False, repr=False, default_factory=dict)
+
+    def __post_init__(self):
+        """Precompute lookup tables for project keywords, watched authors, and journals."""
+        # One regex per project scans the text for all of its keywords in a
+        # single pass (patterns are lowercased to match lowercased text)
+        self._project_patterns = [
+            (project.name, re.compile("|".join(re.escape(kw.lower()) for kw in project.keywords)))
+            for project in self.active_projects
+            if project.keywords
+        ]
+        # One trie-shaped regex scans an author name for every watched name at once
+        if self.watched_authors:
+            self._watched_re = re.compile(
+                _trie_pattern([author.lower() for author in self.watched_authors]),
+                re.IGNORECASE,
+            )
+        else:
+            self._watched_re = None
+
+        # Flatten journal tiers for O(1) lookup (first tier listing a journal wins)
+        self._journal_weight_map = {}
         for tier in self.journal_weights.values():
-            if journal_name in tier.journals:
-                return tier.weight
-        return 1.0
+            for journal in tier.journals:
+                self._journal_weight_map.setdefault(journal.lower(), tier.weight)
+
+    def get_journal_weight(self, journal_name: str) -> float:
+        """Get the weight multiplier for a journal (case-insensitive, default 1.0)."""
+        return self._journal_weight_map.get(journal_name.lower(), 1.0)
 
     def get_all_keywords(self) -> set[str]:
         """Get all keywords across all active projects."""
@@ -54,19 +124,30 @@ class Config:
             keywords.update(project.keywords)
         return keywords
 
-    def match_projects(self, text: str) -> list[str]:
-        """Find which projects match the given text (title + abstract)."""
-        text_lower = text.lower()
-        matched = []
-        for project in self.active_projects:
-            for keyword in project.keywords:
-                if keyword.lower() in text_lower:
-                    matched.append(project.name)
-                    break
-        return matched
+    def match_projects(self, text: str, already_lower: bool = False) -> list[str]:
+        """
+        Find which projects match the given text (title + abstract).
+
+        Pass already_lower=True with pre-lowercased text (e.g. Paper.text_lower)
+        to skip lowercasing it again.
+        """
+        if not self._project_patterns:
+            return []
+        text_lower = text if already_lower else text.lower()
+        return [
+            name for name, pattern in self._project_patterns
+            if pattern.search(text_lower)
+        ]
+
+    def match_watched_authors(self, authors: list[str]) -> list[str]:
+        """Return the authors whose names contain a watched author name."""
+        if self._watched_re is None:
+            return []
+        search = self._watched_re.search
+        return [author for author in authors if search(author)]
 
 
-def load_config(config_path: str | Path | None = None) -> Config:
+def load_config(config_path: Optional[Union[str, Path]] = None) -> Config:
     """
     Load configuration from a YAML file.
 
@@ -91,10 +172,93 @@ def load_config(config_path: str | Path | None = None) -> Config:
     if not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    with open(config_path, "r") as f:
-        raw = yaml.safe_load(f)
+    return parse_config(load_raw_config(config_path))
+
+
+def load_raw_config(config_path: Union[str, Path]) -> dict:
+    """
+    Load a config file as a plain dict, without validating it.
+
+    Shares load_config's cache, so an unchanged file isn't parsed again.
+
+    Args:
+        config_path: Path to the YAML config file (must exist).
+
+    Returns:
+        The parsed config (empty if the file is empty). It's a copy, so
+        callers may modify it without affecting the cache.
+    """
+    return copy.deepcopy(_load_raw(Path(config_path))) or {}
+
+
+def _load_raw(config_path: Path) -> dict:
+    """Parse the YAML file, reusing the previous result if it hasn't changed."""
+    stat = config_path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _raw_config_cache.get(config_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    # Fall back to the on-disk cache from a previous run before parsing YAML
+    cache_path = config_path.with_suffix(CACHE_SUFFIX)
+    raw = _read_cache_file(cache_path, signature)
+    if raw is None:
+        with open(config_path, "r") as f:
+            raw = yaml.load(f, Loader=SafeLoader)
+        _write_cache_file(cache_path, signature, raw)
+
+    _raw_config_cache[config_path] = (signature, raw)
+    return raw
+
+
+def cache_raw_config(config_path: Union[str, Path], raw: dict):
+    """
+    Record `raw` as the parsed contents of a config file that was just written.
+
+    Primes the in-memory and on-disk caches, so the next load doesn't parse
+    the YAML the caller has only just dumped.
+
+    Args:
+        config_path: Path of the YAML file `raw` was written to.
+        raw: The dict that was dumped to it.
+    """
+    config_path = Path(config_path)
+    stat = config_path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    raw = copy.deepcopy(raw)
+    _write_cache_file(config_path.with_suffix(CACHE_SUFFIX), signature, raw)
+    _raw_config_cache[config_path] = (signature, raw)
+
+
+def _read_cache_file(cache_path: Path, signature: tuple[int, int]) -> Optional[dict]:
+    """Load cached parsed YAML if it was written for the same file signature."""
+    # Plain JSON rather than pickle, so a writable config/ directory can
+    # only change settings, never run code
+    try:
+        with open(cache_path, "rb") as f:
+            cached = fastjson.loads(f.read())
+        cached_signature, raw = cached["signature"], cached["raw"]
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+    return raw if cached_signature == list(signature) else None
+
 
-    return parse_config(raw)
+def _write_cache_file(cache_path: Path, signature: tuple[int, int], raw: dict):
+    """Save parsed YAML next to the config file (best effort)."""
+    try:
+        data = fastjson.dumps({"signature": list(signature), "raw": raw})
+    except TypeError:
+        return  # Not JSON-serializable (e.g. a YAML timestamp); just parse next time
+    # Skip values JSON can't represent exactly (dates, non-string keys)
+    if fastjson.loads(data)["raw"] != raw:
+        return
+    try:
+        with open(cache_path, "wb") as f:
+            f.write(data)
+    except OSError:
+        pass
 
 
 def parse_config(raw: dict) -> Config:
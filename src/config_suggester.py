@@ -5,17 +5,68 @@ Analyzes starred/dismissed papers and suggests improvements to
 search queries, project keywords, watched authors, and new projects.
 """
 
+import asyncio
+import hashlib
 import json
 import os
+import re
 from typing import Optional
 
 import anthropic
 
 from .config_loader import Config
 from .database import PaperDatabase
+from .jsonstream import IncrementalJsonArrayParser, loads_lenient
 
+# Starred abstracts are cut to their first sentence, at most this long
+ABSTRACT_EXCERPT_CHARS = 120
 
-def generate_suggestions(config: Config, db: PaperDatabase) -> list[dict]:
+# A response wrapped in a markdown code block, optionally tagged as json
+_FENCE_RE = re.compile(r"^```(?:json)?\s*\n?(.*?)\n?```$", re.DOTALL)
+
+_SYSTEM_PROMPT = (
+    "You are an expert at optimizing literature search configurations for researchers. "
+    "Analyze the provided feedback and suggest improvements. Respond ONLY with valid JSON."
+)
+
+# Fixed instructions that close the config part of the prompt
+_PROMPT_INSTRUCTIONS = """## Instructions
+
+Identify gaps and suggest improvements. For each suggestion, provide:
+1. What topics or patterns appear in starred papers but aren't well-covered by current search queries?
+2. Are there keywords from starred papers that should be added to projects?
+3. Are there authors who appear frequently in starred papers who should be watched?
+4. Are there overly broad terms catching irrelevant papers (from dismissed)?
+5. Should any new projects be created based on emerging interest patterns?
+
+Respond with a JSON array of suggestions. Each suggestion must have:
+- "type": one of "search_query", "project_keyword", "watched_author", "new_project"
+- "text": human-readable description of the suggestion
+- "data": object for auto-applying (see formats below)
+- "rationale": why this suggestion is made
+
+Data formats:
+- search_query: {"query": "the PubMed query string"}
+- project_keyword: {"project": "project name", "keyword": "new keyword"}
+- watched_author: {"author": "LastName Initials"}
+- new_project: {"name": "Project Name", "keywords": ["kw1", "kw2"]}
+
+Return 3-8 suggestions. Only suggest things that are clearly supported by the feedback patterns.
+"""
+
+# Shared across calls so the HTTP connection pool is reused between runs
+_client: Optional[anthropic.Anthropic] = None
+
+
+def _get_client() -> anthropic.Anthropic:
+    """Get the module-level Anthropic client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    return _client
+
+
+def generate_suggestions(config: Config, db: PaperDatabase) -> Optional[list[dict]]:
     """
     Generate config suggestions by analyzing feedback patterns.
 
@@ -27,69 +78,177 @@ def generate_suggestions(config: Config, db: PaperDatabase) -> list[dict]:
         db: Database instance.
 
     Returns:
-        List of suggestion dicts, also saved to the database.
+        List of new suggestion dicts, also saved to the database, or None if
+        the config and feedback are unchanged since the last run (whose
+        suggestions are already in the database).
     """
-    feedback_stats = db.get_feedback_stats()
+    # Cheap aggregate first: enough to decide whether a run is needed at all
+    marker = db.get_feedback_marker()
 
-    if feedback_stats["starred"] < 5:
+    if marker["starred"] < 5:
         return []
 
-    starred = db.get_starred_papers(limit=30)
-    dismissed = db.get_dismissed_papers(limit=30)
+    # Same config and no feedback since the last run would get the same
+    # answer, which was already saved (and possibly resolved by the user),
+    # so skip the call without loading papers or building the prompt
+    cache_key = _suggestion_cache_key(config, marker)
+    if db.get_cached_suggestions(cache_key) is not None:
+        return None
+
+    feedback = db.get_feedback_bundle(
+        starred_limit=20,
+        dismissed_limit=15,
+        abstract_chars=ABSTRACT_EXCERPT_CHARS + 1,
+    )
+    feedback_stats = feedback.stats
+    starred = feedback.starred
+    dismissed = feedback.dismissed
 
     # Build context for Claude
-    prompt = _build_suggestion_prompt(config, starred, dismissed, feedback_stats)
+    config_part, feedback_part = _build_suggestion_prompt(config, starred, dismissed, feedback_stats)
 
     # Call Claude
-    client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    client = _get_client()
 
-    response = client.messages.create(
+    # The system prompt and config/instructions block only change when the
+    # config does, so mark them as a cacheable prefix; feedback follows the
+    # cache breakpoint since it changes between runs. The response is
+    # streamed and each suggestion parsed as soon as its closing brace arrives.
+    saved = []
+    chunks = []
+    parser = IncrementalJsonArrayParser()
+    with client.messages.stream(
         model="claude-sonnet-4-6",
         max_tokens=2048,
-        system="You are an expert at optimizing literature search configurations for researchers. Analyze the provided feedback and suggest improvements. Respond ONLY with valid JSON.",
-        messages=[{"role": "user", "content": prompt}],
-    )
+        system=_SYSTEM_PROMPT,
+        messages=[{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": config_part, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": feedback_part},
+            ],
+        }],
+    ) as stream:
+        for text in stream.text_stream:
+            chunks.append(text)
+            for s in parser.feed(text):
+                suggestion = _normalize_suggestion(s)
+                if suggestion:
+                    saved.append(suggestion)
+
+    # Fall back to parsing the full response if no array elements came through
+    content = "".join(chunks)
+    if not saved:
+        for s in _parse_suggestions(content):
+            suggestion = _normalize_suggestion(s)
+            if suggestion:
+                saved.append(suggestion)
+
+    # Keep the raw response so a failed parse can be repaired without another call
+    prompt_hash = hashlib.blake2b((config_part + feedback_part).encode()).hexdigest()
+    db.record_suggestion_run(prompt_hash, content, "parsed" if saved else "parse_failed")
+
+    # Save to database in one transaction
+    if saved:
+        db.add_config_suggestions(saved)
+        db.put_cached_suggestions(cache_key, saved)
+
+    return saved
+
+
+def repair_suggestions(db: PaperDatabase) -> list[dict]:
+    """
+    Re-parse stored responses from suggestion runs that failed to parse.
 
-    content = response.content[0].text.strip()
+    Uses the current (more tolerant) parser on the saved raw responses, so
+    no API calls are made.
+
+    Args:
+        db: Database instance.
+
+    Returns:
+        List of recovered suggestion dicts, also saved to the database.
+    """
+    recovered = []
+    for run in db.get_failed_suggestion_runs():
+        suggestions = []
+        for s in _parse_suggestions(run["raw_response"] or ""):
+            suggestion = _normalize_suggestion(s)
+            if suggestion:
+                suggestions.append(suggestion)
+
+        if suggestions:
+            db.add_config_suggestions(suggestions)
+            db.set_suggestion_run_status(run["id"], "repaired")
+            recovered.extend(suggestions)
+
+    return recovered
+
+
+async def generate_suggestions_async(config: Config, db: PaperDatabase) -> Optional[list[dict]]:
+    """
+    Async variant of generate_suggestions for callers running an event loop.
+
+    The Claude call can take a minute or more, so it runs in a worker thread
+    and the loop stays free for other work (e.g. fetching new papers).
+    PaperDatabase serializes access to its connection, so this is thread-safe.
+
+    Args:
+        config: Current application config.
+        db: Database instance.
+
+    Returns:
+        Same as generate_suggestions (None if nothing changed since the last run).
+    """
+    return await asyncio.to_thread(generate_suggestions, config, db)
+
+
+def _parse_suggestions(content: str) -> list[dict]:
+    """Parse a complete response into a list of suggestion dicts."""
+    content = content.strip()
 
     # Handle markdown code blocks
-    if content.startswith("```"):
-        content = content.split("```")[1]
-        if content.startswith("json"):
-            content = content[4:]
-        content = content.strip()
+    match = _FENCE_RE.match(content)
+    if match:
+        content = match.group(1).strip()
 
     try:
-        suggestions_data = json.loads(content)
+        suggestions_data = loads_lenient(content)
     except json.JSONDecodeError:
-        return []
+        # Truncated or otherwise broken: keep whichever elements are complete
+        return IncrementalJsonArrayParser().feed(content)
 
-    if not isinstance(suggestions_data, list):
+    if isinstance(suggestions_data, dict):
         suggestions_data = suggestions_data.get("suggestions", [])
+    if not isinstance(suggestions_data, list):
+        return []
 
-    # Save to database
-    saved = []
-    for s in suggestions_data:
-        suggestion_type = s.get("type", "search_query")
-        suggestion_text = s.get("text", "")
-        suggestion_data = s.get("data")
-        rationale = s.get("rationale", "")
-
-        if suggestion_text:
-            db.add_config_suggestion(
-                suggestion_type=suggestion_type,
-                suggestion_text=suggestion_text,
-                suggestion_data=suggestion_data,
-                rationale=rationale,
-            )
-            saved.append({
-                "suggestion_type": suggestion_type,
-                "suggestion_text": suggestion_text,
-                "suggestion_data": suggestion_data,
-                "rationale": rationale,
-            })
+    return [s for s in suggestions_data if isinstance(s, dict)]
 
-    return saved
+
+def _normalize_suggestion(s: dict) -> Optional[dict]:
+    """Map one parsed suggestion to database fields, or None if it has no text."""
+    suggestion_text = s.get("text", "")
+    if not suggestion_text:
+        return None
+
+    return {
+        "suggestion_type": s.get("type", "search_query"),
+        "suggestion_text": suggestion_text,
+        "suggestion_data": s.get("data"),
+        "rationale": s.get("rationale", ""),
+    }
+
+
+def _suggestion_cache_key(config: Config, feedback_marker: dict) -> str:
+    """Fingerprint the config and feedback state that a suggestion run depends on."""
+    fingerprint = json.dumps({
+        "q": config.search_queries,
+        "p": [(p.name, p.keywords) for p in config.active_projects],
+        "a": config.watched_authors,
+        "f": feedback_marker,
+    }, sort_keys=True)
+    return hashlib.blake2b(fingerprint.encode()).hexdigest()
 
 
 def _build_suggestion_prompt(
@@ -97,32 +256,43 @@ def _build_suggestion_prompt(
     starred: list,
     dismissed: list,
     stats: dict,
-) -> str:
-    """Build the prompt for generating config suggestions."""
+) -> tuple[str, str]:
+    """
+    Build the prompt for generating config suggestions.
+
+    Returns:
+        Tuple of (config_part, feedback_part). The config part (current
+        config + instructions) is stable across runs and sent as a cached
+        prefix; the feedback part holds the starred/dismissed papers.
+    """
     # Current config summary
-    queries = "\n".join(f"  - {q}" for q in config.search_queries)
-    projects = "\n".join(
+    # (str.join builds a list from a generator anyway, so pass it one directly;
+    # an empty author list joins to "" and falls through to the placeholder)
+    queries = "\n".join([f"  - {q}" for q in config.search_queries])
+    projects = "\n".join([
         f"  - {p.name}: {', '.join(p.keywords)}"
         for p in config.active_projects
-    )
-    authors = "\n".join(f"  - {a}" for a in config.watched_authors) if config.watched_authors else "  (none)"
-
-    # Starred papers summary
-    starred_text = ""
-    for p in starred[:20]:
-        proj = f" [Projects: {', '.join(p.matched_projects)}]" if p.matched_projects else ""
-        starred_text += f"  - \"{p.title}\" ({p.journal}){proj}\n"
+    ])
+    authors = "\n".join([f"  - {a}" for a in config.watched_authors]) or "  (none)"
+
+    # Starred papers summary (title, journal, projects, first sentence of abstract)
+    parts = []
+    for p in starred:
+        proj = f" [Projects: {_project_list(p)}]" if p.matched_projects else ""
+        parts.append(f"  - \"{p.title}\" ({p.journal}){proj}\n")
         if p.abstract:
-            starred_text += f"    Abstract excerpt: {p.abstract[:200]}...\n"
+            parts.append(f"    Abstract excerpt: {_abstract_excerpt(p.abstract)}\n")
+    starred_text = "".join(parts)
 
-    # Dismissed papers summary
-    dismissed_text = ""
-    for p in dismissed[:15]:
-        proj = f" [Projects: {', '.join(p.matched_projects)}]" if p.matched_projects else ""
-        score = f", score: {p.relevance_score:.2f}" if p.relevance_score is not None else ""
-        dismissed_text += f"  - \"{p.title}\" ({p.journal}{score}){proj}\n"
+    # Dismissed papers summary, one compact line each
+    parts = []
+    for p in dismissed:
+        score = f" | s={p.relevance_score:.2f}" if p.relevance_score is not None else ""
+        proj = f" | projects={_project_list(p)}" if p.matched_projects else ""
+        parts.append(f"  - \"{p.title}\" | {p.journal}{score}{proj}\n")
+    dismissed_text = "".join(parts)
 
-    return f"""Analyze this literature monitoring configuration and the researcher's feedback to suggest improvements.
+    config_part = f"""Analyze this literature monitoring configuration and the researcher's feedback (given after these instructions) to suggest improvements.
 
 ## Current Configuration
 
@@ -135,7 +305,9 @@ Active projects:
 Watched authors:
 {authors}
 
-## Feedback Statistics
+{_PROMPT_INSTRUCTIONS}"""
+
+    feedback_part = f"""## Feedback Statistics
 - Starred (valuable): {stats['starred']}
 - Dismissed (not relevant): {stats['dismissed']}
 - Neutral (no feedback): {stats['neutral']}
@@ -146,26 +318,20 @@ Watched authors:
 ## Dismissed Papers (researcher found these NOT relevant):
 {dismissed_text}
 
-## Instructions
+Return ONLY the JSON array, no other text."""
 
-Identify gaps and suggest improvements. For each suggestion, provide:
-1. What topics or patterns appear in starred papers but aren't well-covered by current search queries?
-2. Are there keywords from starred papers that should be added to projects?
-3. Are there authors who appear frequently in starred papers who should be watched?
-4. Are there overly broad terms catching irrelevant papers (from dismissed)?
-5. Should any new projects be created based on emerging interest patterns?
+    return config_part, feedback_part
 
-Respond with a JSON array of suggestions. Each suggestion must have:
-- "type": one of "search_query", "project_keyword", "watched_author", "new_project"
-- "text": human-readable description of the suggestion
-- "data": object for auto-applying (see formats below)
-- "rationale": why this suggestion is made
 
-Data formats:
-- search_query: {{"query": "the PubMed query string"}}
-- project_keyword: {{"project": "project name", "keyword": "new keyword"}}
-- watched_author: {{"author": "LastName Initials"}}
-- new_project: {{"name": "Project Name", "keywords": ["kw1", "kw2"]}}
+def _project_list(paper) -> str:
+    """Format a paper's matched projects without duplicates."""
+    return ", ".join(sorted(set(paper.matched_projects)))
 
-Return 3-8 suggestions. Only suggest things that are clearly supported by the feedback patterns.
-Return ONLY the JSON array, no other text."""
+
+def _abstract_excerpt(abstract: str) -> str:
+    """Shorten an abstract to its first sentence, capped at ABSTRACT_EXCERPT_CHARS."""
+    sentence, end, _ = abstract.partition(". ")
+    sentence += end.rstrip()
+    if len(sentence) > ABSTRACT_EXCERPT_CHARS:
+        return sentence[:ABSTRACT_EXCERPT_CHARS].rstrip() + "..."
+    return sentence
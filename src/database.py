@@ -4,12 +4,14 @@ SQLite database for tracking papers and avoiding duplicates.
 
 import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
+from . import fastjson
 from .sources.pubmed import Paper
 
 
@@ -26,6 +28,46 @@ class ConfigSuggestion:
     reviewed_at: Optional[str]
 
 
+@dataclass
+class FeedbackBundle:
+    """Feedback counts plus the most recent starred and dismissed papers."""
+    stats: dict
+    starred: list[Paper]
+    dismissed: list[Paper]
+
+
+# Insert a paper unless its ID exists (OR IGNORE) or another source already
+# stored the same DOI (cross-source dedup, e.g. bioRxiv and PubMed). Takes the
+# _paper_values() columns followed by the DOI again (None to skip the check).
+INSERT_NEW_PAPER_SQL = """
+    INSERT OR IGNORE INTO papers (
+        id, source, title, authors, journal, pub_date,
+        abstract, url, full_text_url, is_open_access, doi,
+        summary, relevance_score, ranking_rationale, matched_projects,
+        first_seen_date
+    )
+    SELECT ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM papers WHERE doi = ?)
+"""
+
+
+# Current local time as an ISO-8601 string, computed by SQLite inside the
+# statement (same format and clock as datetime.now().isoformat(), to ms)
+SQL_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+# Set (or clear, with NULL) a paper's feedback. Takes (feedback, paper_id).
+SET_FEEDBACK_SQL = f"""
+    UPDATE papers SET
+        user_feedback = ?1,
+        feedback_date = CASE WHEN ?1 IS NULL THEN NULL ELSE {SQL_NOW} END,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?2
+"""
+
+# insert_papers batches at least this large rebuild secondary indexes afterwards
+BULK_INSERT_THRESHOLD = 10_000
+
+
 def get_default_db_path() -> Path:
     """Get the default database path."""
     return Path(__file__).parent.parent / "data" / "papers.db"
@@ -44,36 +86,100 @@ class SearchRun:
 class PaperDatabase:
     """SQLite database for storing and querying papers."""
 
-    def __init__(self, db_path: str | Path | None = None):
+    def __init__(self, db_path: Optional[Union[str, Path]] = None, cache_known_ids: bool = False):
         """
         Initialize the database connection.
 
         Args:
             db_path: Path to SQLite database file. Defaults to data/papers.db.
+            cache_known_ids: Keep every stored paper ID and DOI in memory
+                (loaded on first use) so duplicate checks skip SQLite for
+                papers already seen. Costs ~100 bytes per paper, so it's
+                off by default for the Pi.
         """
         if db_path is None:
             db_path = get_default_db_path()
         self.db_path = Path(db_path)
 
+        # In-memory copies of the stored IDs/DOIs (None until first loaded).
+        # They only ever hold values that are in the table, so a hit is a
+        # definite duplicate; a miss still goes to SQLite, which catches
+        # rows added by another process (e.g. the web UI).
+        self._cache_known_ids = cache_known_ids
+        self._known_ids: Optional[set[str]] = None
+        self._known_dois: Optional[set[str]] = None
+
         # Ensure data directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # One read-write connection per instance, shared by all writes; the
+        # lock serializes use when the instance is shared between threads
+        self._conn = self._connect()
+        self._lock = threading.Lock()
+
         self._init_schema()
 
+        # Reads go through a second, read-only connection with its own lock.
+        # Under WAL it sees the last committed snapshot, so get_* calls from
+        # the web UI don't queue behind an insert_papers batch in progress.
+        self._ro_conn = self._connect(read_only=True)
+        self._ro_lock = threading.Lock()
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a database connection with row factory and per-connection PRAGMAs."""
+        # Every query uses fixed SQL text (ID lists go through json_each), so
+        # a larger statement cache keeps all of them prepared
+        if read_only:
+            conn = sqlite3.connect(
+                self.db_path.resolve().as_uri() + "?mode=ro",
+                uri=True, check_same_thread=False, cached_statements=512,
+            )
+            conn.execute("PRAGMA query_only=1")
+        else:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=512)
+        conn.row_factory = sqlite3.Row
+        # Safe with WAL: commits survive crashes, only an OS crash can lose the last one
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Wait for a concurrent writer (e.g. web UI vs. cron run) instead of failing
+        conn.execute("PRAGMA busy_timeout=5000")
+        # Keep temp tables/sorts in memory, allow up to 64 MiB of page cache,
+        # and read through a memory map (kept modest for 32-bit Pi OS)
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA mmap_size=268435456")
+        return conn
+
     @contextmanager
     def _get_conn(self):
-        """Get a database connection with row factory."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            yield conn
-            conn.commit()
-        finally:
-            conn.close()
+        """Use the shared connection, committing on success and rolling back on error."""
+        with self._lock:
+            try:
+                yield self._conn
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    @contextmanager
+    def _read_conn(self):
+        """Use the read-only connection for queries that don't write."""
+        with self._ro_lock:
+            yield self._ro_conn
+
+    def close(self):
+        """Close the database connections."""
+        with self._ro_lock:
+            self._ro_conn.close()
+        with self._lock:
+            self._conn.close()
 
     def _init_schema(self):
         """Initialize the database schema."""
         with self._get_conn() as conn:
+            # Write-ahead logging: readers (web UI) don't block the writer,
+            # and commits append to the log instead of rewriting pages
+            conn.execute("PRAGMA journal_mode=WAL")
+
             conn.executescript("""
                 CREATE TABLE IF NOT EXISTS papers (
                     id TEXT PRIMARY KEY,
@@ -123,11 +229,32 @@ class PaperDatabase:
                     reviewed_at TEXT
                 );
 
+                CREATE TABLE IF NOT EXISTS suggestion_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    prompt_hash TEXT,
+                    raw_response TEXT,
+                    status TEXT NOT NULL  -- parsed / parse_failed / repaired
+                );
+
+                CREATE TABLE IF NOT EXISTS suggestion_cache (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS lookup_cache (
+                    identifier TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                );
+
                 CREATE INDEX IF NOT EXISTS idx_papers_source ON papers(source);
                 CREATE INDEX IF NOT EXISTS idx_papers_pub_date ON papers(pub_date);
-                CREATE INDEX IF NOT EXISTS idx_papers_relevance ON papers(relevance_score);
-                CREATE INDEX IF NOT EXISTS idx_papers_first_seen ON papers(first_seen_date);
+                CREATE INDEX IF NOT EXISTS idx_papers_doi ON papers(doi);
                 CREATE INDEX IF NOT EXISTS idx_config_suggestions_status ON config_suggestions(status);
+                -- get_search_runs reads the newest runs straight off this index
+                CREATE INDEX IF NOT EXISTS idx_search_runs_date ON search_runs(run_date);
             """)
 
             # Add feedback columns to papers table (migration for existing databases)
@@ -146,37 +273,159 @@ class PaperDatabase:
 
             # Add feedback indexes
             try:
-                conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_feedback ON papers(user_feedback)")
                 conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_seed ON papers(is_seed)")
             except sqlite3.OperationalError:
                 pass
 
+            # Score/date/feedback indexes shaped for the queries that use them,
+            # replacing the single-column relevance, first_seen and feedback
+            # indexes (each was only useful to one of these queries, and the
+            # relevance one was updated on every ranking write)
+            has_query_indexes = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_papers_first_seen_score'"
+            ).fetchone()
+            conn.executescript("""
+                DROP INDEX IF EXISTS idx_papers_relevance;
+                DROP INDEX IF EXISTS idx_papers_first_seen;
+                DROP INDEX IF EXISTS idx_papers_feedback;
+
+                -- get_papers_since: date range, score filter read from the index
+                CREATE INDEX IF NOT EXISTS idx_papers_first_seen_score
+                    ON papers(first_seen_date, relevance_score);
+                -- get_unranked_papers: only the (few) unranked rows
+                CREATE INDEX IF NOT EXISTS idx_papers_unranked
+                    ON papers(first_seen_date) WHERE relevance_score IS NULL;
+                -- get_starred/dismissed_papers: equality + ordered by date, no sort
+                CREATE INDEX IF NOT EXISTS idx_papers_feedback_date
+                    ON papers(user_feedback, feedback_date) WHERE user_feedback IS NOT NULL;
+            """)
+            if not has_query_indexes:
+                conn.execute("ANALYZE")
+
+            # Full-text index over titles and abstracts, kept in sync by triggers.
+            # External content: papers_fts stores only the index and keys on
+            # papers.rowid (stable as long as the table isn't VACUUMed).
+            try:
+                has_fts = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'"
+                ).fetchone()
+                conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                        title, abstract,
+                        content='papers', content_rowid='rowid',
+                        tokenize='porter unicode61'
+                    );
+
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_insert AFTER INSERT ON papers BEGIN
+                        INSERT INTO papers_fts(rowid, title, abstract)
+                        VALUES (new.rowid, new.title, new.abstract);
+                    END;
+
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_delete AFTER DELETE ON papers BEGIN
+                        INSERT INTO papers_fts(papers_fts, rowid, title, abstract)
+                        VALUES ('delete', old.rowid, old.title, old.abstract);
+                    END;
+
+                    CREATE TRIGGER IF NOT EXISTS papers_fts_update AFTER UPDATE OF title, abstract ON papers BEGIN
+                        INSERT INTO papers_fts(papers_fts, rowid, title, abstract)
+                        VALUES ('delete', old.rowid, old.title, old.abstract);
+                        INSERT INTO papers_fts(rowid, title, abstract)
+                        VALUES (new.rowid, new.title, new.abstract);
+                    END;
+                """)
+                if not has_fts:
+                    # Index papers stored before the FTS table existed
+                    conn.execute("INSERT INTO papers_fts(papers_fts) VALUES ('rebuild')")
+                self._has_fts = True
+            except sqlite3.OperationalError:
+                self._has_fts = False  # SQLite built without FTS5
+
+            # Rows written with an explicit NULL is_seed count as non-seeds;
+            # normalize them so queries can use a plain is_seed = FALSE
+            conn.execute("UPDATE papers SET is_seed = FALSE WHERE is_seed IS NULL")
+
+            # Partial index over papers still waiting for a digest; its WHERE
+            # clause must match get_papers_for_digest's filter verbatim
+            # (replaces idx_papers_digest, which also allowed a NULL is_seed)
+            conn.execute("DROP INDEX IF EXISTS idx_papers_digest")
+            has_digest_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_papers_undigested'"
+            ).fetchone()
+            if not has_digest_index:
+                conn.execute("""
+                    CREATE INDEX idx_papers_undigested ON papers(first_seen_date, relevance_score DESC)
+                    WHERE last_digest_date IS NULL AND is_seed = FALSE
+                """)
+                # Refresh planner statistics once so the new index gets picked
+                conn.execute("ANALYZE")
+
+    def _known(self) -> tuple[set[str], set[str]]:
+        """Return the known ID and DOI sets, loading them with one scan on first use."""
+        if self._known_ids is None:
+            with self._read_conn() as conn:
+                cursor = conn.execute("SELECT id, doi FROM papers")
+                known_ids, known_dois = set(), set()
+                for row in cursor:
+                    known_ids.add(row["id"])
+                    if row["doi"]:
+                        known_dois.add(row["doi"])
+            self._known_dois = known_dois
+            self._known_ids = known_ids
+        return self._known_ids, self._known_dois
+
+    def _remember(self, papers: list[Paper]):
+        """Add papers that are now stored to the known sets (if loaded)."""
+        if self._known_ids is None:
+            return
+        for paper in papers:
+            self._known_ids.add(paper.id)
+            if paper.doi:
+                self._known_dois.add(paper.doi)
+
     def paper_exists(self, paper_id: str) -> bool:
         """Check if a paper already exists in the database."""
-        with self._get_conn() as conn:
+        if self._cache_known_ids and paper_id in self._known()[0]:
+            return True
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM papers WHERE id = ?", (paper_id,)
             )
             return cursor.fetchone() is not None
 
     def get_existing_ids(self, paper_ids: list[str]) -> set[str]:
-        """Get the subset of paper IDs that already exist in the database."""
+        """
+        Get the subset of paper IDs that already exist in the database.
+
+        The IDs are bound as a single JSON array, so any number of them can be
+        checked with one fixed statement (no per-size IN list, no 999-variable
+        limit) and no temp table to fill and clear.
+        """
         if not paper_ids:
             return set()
 
-        with self._get_conn() as conn:
-            placeholders = ",".join("?" * len(paper_ids))
+        # Only IDs missing from the in-memory set need a database lookup
+        found = set()
+        if self._cache_known_ids:
+            known_ids = self._known()[0]
+            found = {paper_id for paper_id in paper_ids if paper_id in known_ids}
+            paper_ids = [paper_id for paper_id in paper_ids if paper_id not in found]
+            if not paper_ids:
+                return found
+
+        with self._read_conn() as conn:
             cursor = conn.execute(
-                f"SELECT id FROM papers WHERE id IN ({placeholders})",
-                paper_ids
+                "SELECT id FROM papers WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(dict.fromkeys(paper_ids))),)
             )
-            return {row["id"] for row in cursor.fetchall()}
+            return found | {row["id"] for row in cursor}
 
     def doi_exists(self, doi: str) -> bool:
         """Check if a paper with this DOI already exists (cross-source dedup)."""
         if not doi:
             return False
-        with self._get_conn() as conn:
+        if self._cache_known_ids and doi in self._known()[1]:
+            return True
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM papers WHERE doi = ? AND doi IS NOT NULL", (doi,)
             )
@@ -195,40 +444,19 @@ class PaperDatabase:
         Returns:
             True if inserted, False if already exists.
         """
-        if self.paper_exists(paper.id):
-            return False
-
-        # Cross-source dedup: skip if a paper with the same DOI already exists
-        if paper.doi and self.doi_exists(paper.doi):
+        if self._cache_known_ids and not self._filter_known([paper]):
             return False
 
         with self._get_conn() as conn:
-            conn.execute("""
-                INSERT INTO papers (
-                    id, source, title, authors, journal, pub_date,
-                    abstract, url, full_text_url, is_open_access, doi,
-                    summary, relevance_score, ranking_rationale, matched_projects,
-                    first_seen_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                paper.id,
-                paper.source,
-                paper.title,
-                json.dumps(paper.authors),
-                paper.journal,
-                paper.pub_date,
-                paper.abstract,
-                paper.url,
-                paper.full_text_url,
-                paper.is_open_access,
-                paper.doi,
-                paper.summary,
-                paper.relevance_score,
-                paper.ranking_rationale,
-                json.dumps(paper.matched_projects) if paper.matched_projects else None,
-                datetime.now().isoformat(),
-            ))
-        return True
+            cursor = conn.execute(
+                INSERT_NEW_PAPER_SQL,
+                self._paper_values(paper, datetime.now().isoformat()) + (paper.doi or None,)
+            )
+            inserted = cursor.rowcount == 1
+
+        if inserted:
+            self._remember([paper])
+        return inserted
 
     def insert_papers(self, papers: list[Paper]) -> tuple[int, int]:
         """
@@ -240,11 +468,92 @@ class PaperDatabase:
         Returns:
             Tuple of (total_count, new_count).
         """
-        new_count = 0
+        if not papers:
+            return 0, 0
+
+        total = len(papers)
+        if self._cache_known_ids:
+            papers = self._filter_known(papers)
+            if not papers:
+                return total, 0
+
+        # Same dedup rules as insert_paper, applied in one executemany/transaction
+        # (rows are generated lazily as executemany consumes them)
+        now = datetime.now().isoformat()
+        rows = (self._paper_values(paper, now) + (paper.doi or None,) for paper in papers)
+
+        with self._get_conn() as conn:
+            if len(papers) < BULK_INSERT_THRESHOLD:
+                cursor = conn.executemany(INSERT_NEW_PAPER_SQL, rows)
+            else:
+                # Large imports: drop the secondary indexes, load, and rebuild
+                # each index once instead of updating it per row. The primary
+                # key and idx_papers_doi stay since the dedup checks use them.
+                # All of it runs in one transaction, so a failure restores them.
+                conn.execute("BEGIN")
+                indexes = conn.execute("""
+                    SELECT name, sql FROM sqlite_master
+                    WHERE type = 'index' AND tbl_name = 'papers'
+                      AND sql IS NOT NULL AND name != 'idx_papers_doi'
+                """).fetchall()
+                for index in indexes:
+                    conn.execute(f'DROP INDEX "{index["name"]}"')
+                cursor = conn.executemany(INSERT_NEW_PAPER_SQL, rows)
+                for index in indexes:
+                    conn.execute(index["sql"])
+                conn.execute("ANALYZE papers")
+
+            # rowcount sums the rows inserted (unlike total_changes, it doesn't
+            # include the FTS trigger's writes)
+            new_count = cursor.rowcount
+
+        # Every remaining paper is now stored, or SQLite found its ID/DOI
+        # already there (written by another process), so all are known
+        self._remember(papers)
+        return total, new_count
+
+    def _filter_known(self, papers: list[Paper]) -> list[Paper]:
+        """
+        Drop papers whose ID or DOI is in the known sets or earlier in the list.
+
+        Mirrors INSERT_NEW_PAPER_SQL's dedup rules in memory, so the papers
+        returned are the ones SQLite would insert (barring other writers).
+        """
+        known_ids, known_dois = self._known()
+        batch_ids, batch_dois = set(), set()
+        candidates = []
         for paper in papers:
-            if self.insert_paper(paper):
-                new_count += 1
-        return len(papers), new_count
+            if paper.id in known_ids or paper.id in batch_ids:
+                continue
+            if paper.doi and (paper.doi in known_dois or paper.doi in batch_dois):
+                continue
+            batch_ids.add(paper.id)
+            if paper.doi:
+                batch_dois.add(paper.doi)
+            candidates.append(paper)
+        return candidates
+
+    @staticmethod
+    def _paper_values(paper: Paper, first_seen_date: str) -> tuple:
+        """Column values for inserting a paper, in INSERT column order."""
+        return (
+            paper.id,
+            paper.source,
+            paper.title,
+            json.dumps(paper.authors),
+            paper.journal,
+            paper.pub_date,
+            paper.abstract,
+            paper.url,
+            paper.full_text_url,
+            paper.is_open_access,
+            paper.doi,
+            paper.summary,
+            paper.relevance_score,
+            paper.ranking_rationale,
+            json.dumps(paper.matched_projects) if paper.matched_projects else None,
+            first_seen_date,
+        )
 
     def update_paper_ranking(
         self,
@@ -274,7 +583,7 @@ class PaperDatabase:
 
     def get_paper(self, paper_id: str) -> Optional[Paper]:
         """Get a paper by ID."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM papers WHERE id = ?", (paper_id,)
             )
@@ -283,13 +592,26 @@ class PaperDatabase:
                 return self._row_to_paper(row)
         return None
 
+    def get_papers(self, paper_ids: list[str]) -> list[Paper]:
+        """Get papers by ID, in the given order (IDs not in the database are skipped)."""
+        if not paper_ids:
+            return []
+
+        with self._read_conn() as conn:
+            cursor = conn.execute(
+                "SELECT * FROM papers WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(dict.fromkeys(paper_ids))),)
+            )
+            found = {row["id"]: self._row_to_paper(row) for row in cursor}
+        return [found[paper_id] for paper_id in paper_ids if paper_id in found]
+
     def get_unranked_papers(self) -> list[Paper]:
         """Get all papers that haven't been ranked yet."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM papers WHERE relevance_score IS NULL"
             )
-            return [self._row_to_paper(row) for row in cursor.fetchall()]
+            return [self._row_to_paper(row) for row in cursor]
 
     def get_papers_since(
         self,
@@ -315,15 +637,67 @@ class PaperDatabase:
             query += " AND relevance_score >= ?"
             params.append(min_score)
 
+        # NULLs already sort first in SQLite, so DESC NULLS LAST is its
+        # natural descending order (no separate DESC index needed)
         query += " ORDER BY relevance_score DESC NULLS LAST"
 
         if limit:
             query += " LIMIT ?"
             params.append(limit)
 
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(query, params)
-            return [self._row_to_paper(row) for row in cursor.fetchall()]
+            return [self._row_to_paper(row) for row in cursor]
+
+    def search_papers(
+        self,
+        query: str,
+        min_score: Optional[float] = None,
+        limit: int = 50,
+    ) -> list[Paper]:
+        """
+        Full-text search over paper titles and abstracts.
+
+        Args:
+            query: FTS5 query (e.g. 'biliary atresia', '"gut microbiome" OR bile').
+            min_score: Minimum relevance score filter.
+            limit: Maximum number of matches to consider.
+
+        Returns:
+            Matching papers, best BM25 match first.
+        """
+        if not self._has_fts:
+            # No FTS5 in this SQLite build: fall back to a substring scan
+            sql = "SELECT * FROM papers WHERE (title LIKE ? OR abstract LIKE ?)"
+            params: list = [f"%{query}%", f"%{query}%"]
+            if min_score is not None:
+                sql += " AND relevance_score >= ?"
+                params.append(min_score)
+            sql += " ORDER BY relevance_score DESC NULLS LAST LIMIT ?"
+            params.append(limit)
+        else:
+            # Rank inside the FTS index first (CTE), then join and filter, so
+            # the planner can't start from a papers index instead
+            sql = """
+                WITH matches AS (
+                    SELECT rowid, bm25(papers_fts) AS rank
+                    FROM papers_fts
+                    WHERE papers_fts MATCH ?
+                    ORDER BY rank
+                    LIMIT ?
+                )
+                SELECT papers.* FROM matches
+                JOIN papers ON papers.rowid = matches.rowid
+            """
+            params = [query, limit]
+            if min_score is not None:
+                sql += " WHERE papers.relevance_score >= ?"
+                params.append(min_score)
+            sql += " ORDER BY matches.rank"
+
+        with self._read_conn() as conn:
+            cursor = conn.execute(sql, params)
+            return [self._row_to_paper(row) for row in cursor]
 
     def get_recent_papers(
         self,
@@ -355,13 +729,13 @@ class PaperDatabase:
         """Mark papers as included in a digest so they aren't re-sent."""
         if not paper_ids:
             return
-        now = datetime.now().isoformat()
+        # One statement, so every paper gets the same digest timestamp
         with self._get_conn() as conn:
-            for paper_id in paper_ids:
-                conn.execute(
-                    "UPDATE papers SET last_digest_date = ? WHERE id = ?",
-                    (now, paper_id)
-                )
+            conn.execute(
+                f"UPDATE papers SET last_digest_date = {SQL_NOW} "
+                "WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps(paper_ids),)
+            )
 
     def get_papers_for_digest(
         self,
@@ -378,10 +752,10 @@ class PaperDatabase:
         Returns:
             List of papers not yet included in any digest, ordered by score.
         """
-        from datetime import timedelta
         since = (datetime.now() - timedelta(days=days)).isoformat()
 
-        query = "SELECT * FROM papers WHERE first_seen_date >= ? AND last_digest_date IS NULL AND (is_seed IS NULL OR is_seed = FALSE)"
+        # Filter matches the idx_papers_undigested partial index
+        query = "SELECT * FROM papers WHERE first_seen_date >= ? AND last_digest_date IS NULL AND is_seed = FALSE"
         params: list = [since]
 
         if min_score is not None:
@@ -390,9 +764,9 @@ class PaperDatabase:
 
         query += " ORDER BY relevance_score DESC NULLS LAST"
 
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(query, params)
-            return [self._row_to_paper(row) for row in cursor.fetchall()]
+            return [self._row_to_paper(row) for row in cursor]
 
     def record_search_run(
         self,
@@ -407,11 +781,10 @@ class PaperDatabase:
             The ID of the new search run record.
         """
         with self._get_conn() as conn:
-            cursor = conn.execute("""
+            cursor = conn.execute(f"""
                 INSERT INTO search_runs (run_date, papers_found, new_papers, high_priority_count)
-                VALUES (?, ?, ?, ?)
+                VALUES ({SQL_NOW}, ?, ?, ?)
             """, (
-                datetime.now().isoformat(),
                 papers_found,
                 new_papers,
                 high_priority_count,
@@ -420,7 +793,7 @@ class PaperDatabase:
 
     def get_search_runs(self, limit: int = 10) -> list[SearchRun]:
         """Get recent search runs."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM search_runs ORDER BY run_date DESC LIMIT ?",
                 (limit,)
@@ -433,7 +806,7 @@ class PaperDatabase:
                     new_papers=row["new_papers"],
                     high_priority_count=row["high_priority_count"],
                 )
-                for row in cursor.fetchall()
+                for row in cursor
             ]
 
     # --- Feedback methods ---
@@ -447,51 +820,136 @@ class PaperDatabase:
             feedback: 'star', 'dismiss', or None to clear.
         """
         with self._get_conn() as conn:
-            conn.execute("""
-                UPDATE papers SET
-                    user_feedback = ?,
-                    feedback_date = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            """, (feedback, datetime.now().isoformat() if feedback else None, paper_id))
+            conn.execute(SET_FEEDBACK_SQL, (feedback or None, paper_id))
+
+    def set_feedback_many(self, feedback: list[tuple[str, Optional[str]]]):
+        """
+        Set user feedback on several papers in a single transaction.
+
+        Args:
+            feedback: (paper_id, feedback) pairs, applied in order; feedback is
+                      'star', 'dismiss', or None to clear.
+        """
+        with self._get_conn() as conn:
+            conn.executemany(
+                SET_FEEDBACK_SQL,
+                ((value or None, paper_id) for paper_id, value in feedback)
+            )
 
     def get_starred_papers(self, limit: int = 50) -> list[Paper]:
         """Get papers the user has starred, most recent first."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM papers WHERE user_feedback = 'star' ORDER BY feedback_date DESC LIMIT ?",
                 (limit,)
             )
-            return [self._row_to_paper(row) for row in cursor.fetchall()]
+            return [self._row_to_paper(row) for row in cursor]
 
     def get_dismissed_papers(self, limit: int = 50) -> list[Paper]:
         """Get papers the user has dismissed, most recent first."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM papers WHERE user_feedback = 'dismiss' ORDER BY feedback_date DESC LIMIT ?",
                 (limit,)
             )
-            return [self._row_to_paper(row) for row in cursor.fetchall()]
+            return [self._row_to_paper(row) for row in cursor]
 
     def get_feedback_stats(self) -> dict:
         """Get counts of starred, dismissed, and neutral papers."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
+            return self._query_feedback_stats(conn)
+
+    def _query_feedback_stats(self, conn: sqlite3.Connection) -> dict:
+        """Count starred, dismissed, neutral, and seed papers on an open connection."""
+        cursor = conn.execute("""
+            SELECT
+                COUNT(CASE WHEN user_feedback = 'star' THEN 1 END) as starred,
+                COUNT(CASE WHEN user_feedback = 'dismiss' THEN 1 END) as dismissed,
+                COUNT(CASE WHEN user_feedback IS NULL THEN 1 END) as neutral,
+                COUNT(CASE WHEN is_seed = TRUE THEN 1 END) as seeds
+            FROM papers
+        """)
+        row = cursor.fetchone()
+        return {
+            "starred": row["starred"],
+            "dismissed": row["dismissed"],
+            "neutral": row["neutral"],
+            "seeds": row["seeds"],
+        }
+
+    def get_feedback_marker(self) -> dict:
+        """
+        Summarize the current feedback state in one indexed aggregate query.
+
+        Starring, dismissing, or clearing any paper changes the result, so it
+        can be compared against a previous run to detect new feedback.
+
+        Returns:
+            Dict with starred and dismissed counts and the latest feedback date.
+        """
+        with self._read_conn() as conn:
             cursor = conn.execute("""
                 SELECT
                     COUNT(CASE WHEN user_feedback = 'star' THEN 1 END) as starred,
                     COUNT(CASE WHEN user_feedback = 'dismiss' THEN 1 END) as dismissed,
-                    COUNT(CASE WHEN user_feedback IS NULL THEN 1 END) as neutral,
-                    COUNT(CASE WHEN is_seed = TRUE THEN 1 END) as seeds
+                    MAX(feedback_date) as last_feedback_date
                 FROM papers
+                WHERE user_feedback IN ('star', 'dismiss')
             """)
             row = cursor.fetchone()
             return {
                 "starred": row["starred"],
                 "dismissed": row["dismissed"],
-                "neutral": row["neutral"],
-                "seeds": row["seeds"],
+                "last_feedback_date": row["last_feedback_date"],
             }
 
+    def get_feedback_bundle(
+        self,
+        starred_limit: int = 20,
+        dismissed_limit: int = 15,
+        abstract_chars: int = 200,
+    ) -> FeedbackBundle:
+        """
+        Get feedback stats and recent starred/dismissed papers in one go.
+
+        Both paper lists come from a single query, ranked per feedback type
+        and limited in SQL, with abstracts truncated to `abstract_chars`.
+
+        Args:
+            starred_limit: Maximum starred papers to return.
+            dismissed_limit: Maximum dismissed papers to return.
+            abstract_chars: Length to truncate abstracts to.
+
+        Returns:
+            FeedbackBundle with stats and papers, most recent feedback first.
+        """
+        with self._read_conn() as conn:
+            stats = self._query_feedback_stats(conn)
+            cursor = conn.execute("""
+                SELECT id, source, title, authors, journal, pub_date,
+                       substr(abstract, 1, ?) AS abstract,
+                       url, full_text_url, is_open_access, doi, summary,
+                       relevance_score, ranking_rationale, matched_projects,
+                       user_feedback, feedback_date, is_seed, seed_source
+                FROM (
+                    SELECT *, ROW_NUMBER() OVER (
+                        PARTITION BY user_feedback ORDER BY feedback_date DESC
+                    ) AS feedback_rank
+                    FROM papers
+                    WHERE user_feedback IN ('star', 'dismiss')
+                )
+                WHERE (user_feedback = 'star' AND feedback_rank <= ?)
+                   OR (user_feedback = 'dismiss' AND feedback_rank <= ?)
+                ORDER BY feedback_date DESC
+            """, (abstract_chars, starred_limit, dismissed_limit))
+
+            starred, dismissed = [], []
+            for row in cursor:
+                paper = self._row_to_paper(row)
+                (starred if row["user_feedback"] == "star" else dismissed).append(paper)
+
+        return FeedbackBundle(stats=stats, starred=starred, dismissed=dismissed)
+
     # --- Seed paper methods ---
 
     def insert_seed_paper(self, paper: Paper, source: str = "doi_lookup") -> bool:
@@ -505,59 +963,59 @@ class PaperDatabase:
         Returns:
             True if inserted, False if already exists (updates feedback if exists).
         """
-        if self.paper_exists(paper.id):
-            # If paper exists, just mark it as seed + starred
-            with self._get_conn() as conn:
-                conn.execute("""
-                    UPDATE papers SET
-                        is_seed = TRUE,
-                        seed_source = ?,
-                        user_feedback = 'star',
-                        feedback_date = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, (source, datetime.now().isoformat(), paper.id))
-            return False
+        return bool(self.insert_seed_papers([paper], source=source))
 
+    def insert_seed_papers(self, papers: list[Paper], source: str = "doi_lookup") -> list[Paper]:
+        """
+        Insert several seed papers (auto-starred) in one transaction.
+
+        Papers already in the database are marked as seed + starred instead.
+
+        Args:
+            papers: Paper objects to insert.
+            source: How the seeds were added ('doi_lookup', 'pmid_lookup', 'zotero_sync').
+
+        Returns:
+            The papers that were newly inserted.
+        """
+        if not papers:
+            return []
+
+        now = datetime.now().isoformat()
         with self._get_conn() as conn:
-            conn.execute("""
+            cursor = conn.execute(
+                "SELECT id FROM papers WHERE id IN (SELECT value FROM json_each(?))",
+                (json.dumps([paper.id for paper in papers]),)
+            )
+            existing = {row["id"] for row in cursor}
+
+            # One upsert per paper: new rows are inserted, existing ones promoted
+            conn.executemany("""
                 INSERT INTO papers (
                     id, source, title, authors, journal, pub_date,
                     abstract, url, full_text_url, is_open_access, doi,
                     summary, relevance_score, ranking_rationale, matched_projects,
                     first_seen_date, is_seed, seed_source, user_feedback, feedback_date
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                paper.id,
-                paper.source,
-                paper.title,
-                json.dumps(paper.authors),
-                paper.journal,
-                paper.pub_date,
-                paper.abstract,
-                paper.url,
-                paper.full_text_url,
-                paper.is_open_access,
-                paper.doi,
-                paper.summary,
-                paper.relevance_score,
-                paper.ranking_rationale,
-                json.dumps(paper.matched_projects) if paper.matched_projects else None,
-                datetime.now().isoformat(),
-                True,
-                source,
-                "star",
-                datetime.now().isoformat(),
-            ))
-        return True
+                ON CONFLICT(id) DO UPDATE SET
+                    is_seed = TRUE,
+                    seed_source = excluded.seed_source,
+                    user_feedback = 'star',
+                    feedback_date = excluded.feedback_date,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (self._paper_values(paper, now) + (True, source, "star", now) for paper in papers))
+
+        self._remember(papers)
+        new_papers = {paper.id: paper for paper in papers if paper.id not in existing}
+        return list(new_papers.values())
 
     def get_seed_papers(self) -> list[Paper]:
         """Get all seed papers."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM papers WHERE is_seed = TRUE ORDER BY created_at DESC"
             )
-            return [self._row_to_paper(row) for row in cursor.fetchall()]
+            return [self._row_to_paper(row) for row in cursor]
 
     # --- Config suggestion methods ---
 
@@ -592,22 +1050,48 @@ class PaperDatabase:
             ))
             return cursor.lastrowid
 
+    def add_config_suggestions(self, suggestions: list[dict]) -> int:
+        """
+        Add several config suggestions in one transaction.
+
+        Args:
+            suggestions: Dicts with suggestion_type, suggestion_text,
+                         suggestion_data, and rationale keys.
+
+        Returns:
+            Number of suggestions added.
+        """
+        with self._get_conn() as conn:
+            conn.executemany("""
+                INSERT INTO config_suggestions (suggestion_type, suggestion_text, suggestion_data, rationale)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (
+                    s["suggestion_type"],
+                    s["suggestion_text"],
+                    json.dumps(s["suggestion_data"]) if s["suggestion_data"] else None,
+                    s["rationale"],
+                )
+                for s in suggestions
+            ])
+        return len(suggestions)
+
     def get_pending_suggestions(self) -> list[ConfigSuggestion]:
         """Get all pending config suggestions."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM config_suggestions WHERE status = 'pending' ORDER BY created_at DESC"
             )
-            return [self._row_to_suggestion(row) for row in cursor.fetchall()]
+            return [self._row_to_suggestion(row) for row in cursor]
 
     def get_all_suggestions(self, limit: int = 50) -> list[ConfigSuggestion]:
         """Get all config suggestions."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             cursor = conn.execute(
                 "SELECT * FROM config_suggestions ORDER BY created_at DESC LIMIT ?",
                 (limit,)
             )
-            return [self._row_to_suggestion(row) for row in cursor.fetchall()]
+            return [self._row_to_suggestion(row) for row in cursor]
 
     def resolve_suggestion(self, suggestion_id: int, status: str):
         """
@@ -618,12 +1102,103 @@ class PaperDatabase:
             status: New status ('accepted' or 'dismissed').
         """
         with self._get_conn() as conn:
-            conn.execute("""
+            conn.execute(f"""
                 UPDATE config_suggestions SET
                     status = ?,
-                    reviewed_at = ?
+                    reviewed_at = {SQL_NOW}
                 WHERE id = ?
-            """, (status, datetime.now().isoformat(), suggestion_id))
+            """, (status, suggestion_id))
+
+    def record_suggestion_run(self, prompt_hash: str, raw_response: str, status: str) -> int:
+        """
+        Keep Claude's raw response for a suggestion run.
+
+        Args:
+            prompt_hash: Hash of the prompt that produced the response.
+            raw_response: Full response text.
+            status: 'parsed' or 'parse_failed'.
+
+        Returns:
+            ID of the new run.
+        """
+        with self._get_conn() as conn:
+            cursor = conn.execute(f"""
+                INSERT INTO suggestion_runs (created_at, prompt_hash, raw_response, status)
+                VALUES ({SQL_NOW}, ?, ?, ?)
+            """, (prompt_hash, raw_response, status))
+            return cursor.lastrowid
+
+    def get_failed_suggestion_runs(self) -> list[dict]:
+        """Get suggestion runs whose response couldn't be parsed, oldest first."""
+        with self._read_conn() as conn:
+            cursor = conn.execute(
+                "SELECT id, created_at, raw_response FROM suggestion_runs WHERE status = 'parse_failed' ORDER BY id"
+            )
+            return [dict(row) for row in cursor]
+
+    def set_suggestion_run_status(self, run_id: int, status: str):
+        """Update the status of a suggestion run (e.g. to 'repaired')."""
+        with self._get_conn() as conn:
+            conn.execute(
+                "UPDATE suggestion_runs SET status = ? WHERE id = ?",
+                (status, run_id)
+            )
+
+    def get_cached_suggestions(self, key: str, max_age_days: int = 7) -> Optional[list[dict]]:
+        """
+        Get suggestions previously generated for the same config and feedback.
+
+        Args:
+            key: Fingerprint of the config and feedback the suggestions came from.
+            max_age_days: Ignore cache entries older than this.
+
+        Returns:
+            List of suggestion dicts, or None on a cache miss.
+        """
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self._read_conn() as conn:
+            cursor = conn.execute(
+                "SELECT payload FROM suggestion_cache WHERE key = ? AND created_at >= ?",
+                (key, cutoff)
+            )
+            row = cursor.fetchone()
+            return json.loads(row["payload"]) if row else None
+
+    def put_cached_suggestions(self, key: str, suggestions: list[dict]):
+        """Store generated suggestions under their config/feedback fingerprint."""
+        with self._get_conn() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO suggestion_cache (key, payload, created_at) VALUES (?, ?, {SQL_NOW})",
+                (key, json.dumps(suggestions))
+            )
+
+    def get_cached_lookup(self, identifier: str, max_age_days: int = 30) -> Optional[Paper]:
+        """
+        Get paper metadata previously fetched for a DOI/PMID lookup.
+
+        Args:
+            identifier: Normalized lookup key (e.g. "pmid:12345" or "doi:10.1234/x").
+            max_age_days: Ignore cache entries older than this.
+
+        Returns:
+            Paper object, or None on a cache miss.
+        """
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+        with self._read_conn() as conn:
+            cursor = conn.execute(
+                "SELECT payload FROM lookup_cache WHERE identifier = ? AND created_at >= ?",
+                (identifier, cutoff)
+            )
+            row = cursor.fetchone()
+            return Paper(**fastjson.loads(row["payload"])) if row else None
+
+    def put_cached_lookup(self, identifier: str, paper: Paper):
+        """Store paper metadata fetched for a DOI/PMID lookup."""
+        with self._get_conn() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO lookup_cache (identifier, payload, created_at) VALUES (?, ?, {SQL_NOW})",
+                (identifier, json.dumps(paper.to_dict()))
+            )
 
     def _row_to_suggestion(self, row: sqlite3.Row) -> ConfigSuggestion:
         """Convert a database row to a ConfigSuggestion object."""
@@ -643,61 +1218,51 @@ class PaperDatabase:
 
     def get_stats(self) -> dict:
         """Get database statistics."""
-        with self._get_conn() as conn:
+        with self._read_conn() as conn:
             stats = {}
 
-            # Total papers
-            cursor = conn.execute("SELECT COUNT(*) as count FROM papers")
-            stats["total_papers"] = cursor.fetchone()["count"]
-
-            # By source
-            cursor = conn.execute(
-                "SELECT source, COUNT(*) as count FROM papers GROUP BY source"
-            )
-            stats["by_source"] = {row["source"]: row["count"] for row in cursor.fetchall()}
-
-            # Ranked vs unranked
-            cursor = conn.execute(
-                "SELECT COUNT(*) as count FROM papers WHERE relevance_score IS NOT NULL"
-            )
-            stats["ranked_papers"] = cursor.fetchone()["count"]
-
-            # High priority (score >= 0.7)
-            cursor = conn.execute(
-                "SELECT COUNT(*) as count FROM papers WHERE relevance_score >= 0.7"
-            )
-            stats["high_priority"] = cursor.fetchone()["count"]
-
-            # Search runs
-            cursor = conn.execute("SELECT COUNT(*) as count FROM search_runs")
-            stats["total_runs"] = cursor.fetchone()["count"]
-
-            # Feedback stats
+            # Paper counts in one pass over the table
             cursor = conn.execute("""
                 SELECT
+                    COUNT(*) as total,
+                    COUNT(relevance_score) as ranked,
+                    COUNT(CASE WHEN relevance_score >= 0.7 THEN 1 END) as high_priority,
                     COUNT(CASE WHEN user_feedback = 'star' THEN 1 END) as starred,
                     COUNT(CASE WHEN user_feedback = 'dismiss' THEN 1 END) as dismissed,
                     COUNT(CASE WHEN is_seed = TRUE THEN 1 END) as seeds
                 FROM papers
             """)
             row = cursor.fetchone()
+            stats["total_papers"] = row["total"]
+            stats["ranked_papers"] = row["ranked"]  # COUNT(col) skips NULLs
+            stats["high_priority"] = row["high_priority"]
             stats["starred"] = row["starred"]
             stats["dismissed"] = row["dismissed"]
             stats["seeds"] = row["seeds"]
 
+            # By source
+            cursor = conn.execute(
+                "SELECT source, COUNT(*) as count FROM papers GROUP BY source"
+            )
+            stats["by_source"] = {row["source"]: row["count"] for row in cursor}
+
+            # Search runs
+            cursor = conn.execute("SELECT COUNT(*) as count FROM search_runs")
+            stats["total_runs"] = cursor.fetchone()["count"]
+
             return stats
 
     def _row_to_paper(self, row: sqlite3.Row) -> Paper:
         """Convert a database row to a Paper object."""
         authors = row["authors"]
         if authors:
-            authors = json.loads(authors)
+            authors = fastjson.loads(authors)
         else:
             authors = []
 
         matched_projects = row["matched_projects"]
         if matched_projects:
-            matched_projects = json.loads(matched_projects)
+            matched_projects = fastjson.loads(matched_projects)
         else:
             matched_projects = []
 
@@ -720,10 +1285,11 @@ class PaperDatabase:
         )
 
         # Attach feedback metadata (not part of Paper dataclass, but useful for display)
-        paper._user_feedback = row["user_feedback"] if "user_feedback" in row.keys() else None
-        paper._feedback_date = row["feedback_date"] if "feedback_date" in row.keys() else None
-        paper._is_seed = bool(row["is_seed"]) if "is_seed" in row.keys() else False
-        paper._seed_source = row["seed_source"] if "seed_source" in row.keys() else None
+        keys = row.keys()  # Builds a new list on every call, so look it up once
+        paper._user_feedback = row["user_feedback"] if "user_feedback" in keys else None
+        paper._feedback_date = row["feedback_date"] if "feedback_date" in keys else None
+        paper._is_seed = bool(row["is_seed"]) if "is_seed" in keys else False
+        paper._seed_source = row["seed_source"] if "seed_source" in keys else None
 
         return paper
 
@@ -5,7 +5,7 @@ Generates HTML email digests of ranked papers and optionally sends via SMTP.
 Supports Capacities integration for saving digests to daily notes.
 """
 
-import base64
+import functools
 import hashlib
 import hmac
 import json
@@ -14,12 +14,24 @@ import smtplib
 import time
 import urllib.parse
 import requests
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from email.message import EmailMessage
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Union
 
+from jinja2 import Environment
+from markupsafe import Markup, escape
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# pybase64's SIMD encoder when installed (same API and output as base64's)
+try:
+    from pybase64 import urlsafe_b64encode
+except ImportError:
+    from base64 import urlsafe_b64encode
+
+from . import fastjson
 from .config_loader import Config
 from .database import PaperDatabase
 from .sources.pubmed import Paper
@@ -27,166 +39,14 @@ from .sources.pubmed import Paper
 
 CAPACITIES_API_BASE = 'https://api.capacities.io'
 
+# Shared Capacities session (created on first use) so repeated saves reuse
+# one TLS connection
+_capacities_session: Optional[requests.Session] = None
 
-def generate_hmac_signature(data: str, timestamp: str, secret: str) -> str:
-    """
-    Generate HMAC-SHA256 signature matching the Cloudflare Worker's algorithm.
-
-    Args:
-        data: Base64-encoded paper data.
-        timestamp: Unix timestamp in milliseconds.
-        secret: Signing secret.
-
-    Returns:
-        Hex-encoded HMAC signature.
-    """
-    message = f"{data}.{timestamp}"
-    signature = hmac.new(
-        secret.encode(),
-        message.encode(),
-        hashlib.sha256
-    ).hexdigest()
-    return signature
-
-
-def generate_feedback_link(
-    paper: Paper,
-    action: str,
-    worker_url: Optional[str] = None,
-    signing_secret: Optional[str] = None,
-) -> Optional[str]:
-    """
-    Generate a one-click feedback link (star or dismiss) with HMAC signature.
-
-    Args:
-        paper: Paper to generate link for.
-        action: 'star' or 'dismiss'.
-        worker_url: Cloudflare Worker URL.
-        signing_secret: Secret for HMAC signing.
-
-    Returns:
-        URL string or None if not configured.
-    """
-    if not worker_url or not signing_secret:
-        return None
-
-    # Encode minimal payload (just paper_id and title for confirmation)
-    metadata = {
-        "paper_id": paper.id,
-        "title": paper.title,
-    }
-    encoded = base64.urlsafe_b64encode(
-        json.dumps(metadata).encode()
-    ).decode().rstrip('=')
-
-    timestamp = str(int(time.time() * 1000))
-    signature = generate_hmac_signature(encoded, timestamp, signing_secret)
-
-    return f"{worker_url}/feedback?data={encoded}&ts={timestamp}&sig={signature}&action={action}"
-
-
-def generate_zotero_link(
-    paper: Paper,
-    worker_url: Optional[str] = None,
-    signing_secret: Optional[str] = None,
-) -> str:
-    """
-    Generate a one-click Zotero add link with HMAC signature.
-
-    If worker_url and signing_secret are set, creates a signed link to the
-    Cloudflare Worker. Otherwise, falls back to DOI/paper URL.
-
-    Args:
-        paper: Paper to generate link for.
-        worker_url: Cloudflare Worker URL.
-        signing_secret: Secret for HMAC signing.
-
-    Returns:
-        URL string.
-    """
-    if worker_url and signing_secret:
-        # Encode paper metadata
-        metadata = {
-            "title": paper.title,
-            "authors": paper.authors[:20],  # Limit authors to keep URL reasonable
-            "journal": paper.journal,
-            "date": paper.pub_date,
-            "doi": paper.doi,
-            "url": paper.url,
-            "abstract": paper.abstract[:500] if paper.abstract else "",
-        }
-        encoded = base64.urlsafe_b64encode(
-            json.dumps(metadata).encode()
-        ).decode().rstrip('=')  # Remove padding for cleaner URLs
-
-        # Generate timestamp and signature
-        timestamp = str(int(time.time() * 1000))
-        signature = generate_hmac_signature(encoded, timestamp, signing_secret)
-
-        return f"{worker_url}/add?data={encoded}&ts={timestamp}&sig={signature}"
-
-    elif worker_url:
-        # Worker URL but no signing secret - generate unsigned (will fail at worker)
-        metadata = {
-            "title": paper.title,
-            "authors": paper.authors[:20],
-            "journal": paper.journal,
-            "date": paper.pub_date,
-            "doi": paper.doi,
-            "url": paper.url,
-            "abstract": paper.abstract[:500] if paper.abstract else "",
-        }
-        encoded = base64.urlsafe_b64encode(
-            json.dumps(metadata).encode()
-        ).decode().rstrip('=')
-        return f"{worker_url}/add?data={encoded}"
-
-    else:
-        # Fallback: link to DOI or paper URL
-        if paper.doi:
-            return f"https://doi.org/{paper.doi}"
-        return paper.url
-
-
-def generate_digest_html(
-    papers: list[Paper],
-    config: Config,
-    title: str = "Literature Monitor Digest",
-    worker_url: Optional[str] = None,
-    signing_secret: Optional[str] = None,
-) -> str:
-    """
-    Generate an HTML email digest of ranked papers.
-
-    Args:
-        papers: List of ranked papers (should be sorted by relevance).
-        config: Application config.
-        title: Email subject/title.
-        worker_url: Optional Zotero worker URL.
-        signing_secret: Secret for signing Zotero links.
-
-    Returns:
-        HTML string for the email.
-    """
-    # Categorize papers (note: must check `is not None` since 0.0 is a valid score)
-    high_priority = [p for p in papers if p.relevance_score is not None and p.relevance_score >= 0.7]
-    moderate = [p for p in papers if p.relevance_score is not None and 0.4 <= p.relevance_score < 0.7]
-    low_priority = [p for p in papers if p.relevance_score is not None and p.relevance_score < 0.4]
-
-    # Stats
-    total = len(papers)
-    open_access = sum(1 for p in papers if p.is_open_access)
-
-    date_str = datetime.now().strftime("%B %d, %Y")
-
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        body {{
+# Stylesheet for the digest email. Kept out of the template source so Jinja
+# doesn't have to lex it (and a "{#" in CSS can't be mistaken for a comment).
+_DIGEST_CSS = Markup("""<style>
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, sans-serif;
             line-height: 1.6;
             color: #333;
@@ -194,26 +54,26 @@ def generate_digest_html(
             margin: 0 auto;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             background-color: white;
             border-radius: 8px;
             padding: 30px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             color: #2c3e50;
             border-bottom: 3px solid #3498db;
             padding-bottom: 10px;
             margin-top: 0;
-        }}
-        h2 {{
+        }
+        h2 {
             color: #2c3e50;
             margin-top: 30px;
             padding-bottom: 5px;
             border-bottom: 1px solid #eee;
-        }}
-        .stats {{
+        }
+        .stats {
             background-color: #f8f9fa;
             padding: 15px 20px;
             border-radius: 6px;
@@ -221,100 +81,100 @@ def generate_digest_html(
             display: flex;
             gap: 30px;
             flex-wrap: wrap;
-        }}
-        .stat {{
+        }
+        .stat {
             text-align: center;
-        }}
-        .stat-number {{
+        }
+        .stat-number {
             font-size: 28px;
             font-weight: bold;
             color: #3498db;
-        }}
-        .stat-label {{
+        }
+        .stat-label {
             font-size: 12px;
             color: #666;
             text-transform: uppercase;
-        }}
-        .paper {{
+        }
+        .paper {
             border-left: 4px solid #ddd;
             padding: 15px 20px;
             margin: 20px 0;
             background-color: #fafafa;
             border-radius: 0 6px 6px 0;
-        }}
-        .paper.high-priority {{
+        }
+        .paper.high-priority {
             border-left-color: #e74c3c;
             background-color: #fdf2f2;
-        }}
-        .paper.moderate {{
+        }
+        .paper.moderate {
             border-left-color: #f39c12;
             background-color: #fffbf0;
-        }}
-        .paper.low-priority {{
+        }
+        .paper.low-priority {
             border-left-color: #95a5a6;
-        }}
-        .paper-title {{
+        }
+        .paper-title {
             font-size: 16px;
             font-weight: 600;
             color: #2c3e50;
             margin-bottom: 8px;
-        }}
-        .paper-title a {{
+        }
+        .paper-title a {
             color: #2c3e50;
             text-decoration: none;
-        }}
-        .paper-title a:hover {{
+        }
+        .paper-title a:hover {
             color: #3498db;
             text-decoration: underline;
-        }}
-        .paper-meta {{
+        }
+        .paper-meta {
             font-size: 13px;
             color: #666;
             margin-bottom: 10px;
-        }}
-        .paper-meta .journal {{
+        }
+        .paper-meta .journal {
             font-style: italic;
-        }}
-        .paper-meta .date {{
+        }
+        .paper-meta .date {
             color: #888;
-        }}
-        .score-badge {{
+        }
+        .score-badge {
             display: inline-block;
             padding: 2px 8px;
             border-radius: 12px;
             font-size: 12px;
             font-weight: bold;
             margin-right: 8px;
-        }}
-        .score-high {{
+        }
+        .score-high {
             background-color: #e74c3c;
             color: white;
-        }}
-        .score-moderate {{
+        }
+        .score-moderate {
             background-color: #f39c12;
             color: white;
-        }}
-        .score-low {{
+        }
+        .score-low {
             background-color: #95a5a6;
             color: white;
-        }}
-        .paper-summary {{
+        }
+        .paper-summary {
             margin: 12px 0;
             padding: 10px;
             background-color: white;
             border-radius: 4px;
             font-size: 14px;
-        }}
-        .paper-rationale {{
+        }
+        .paper-rationale {
             font-size: 13px;
             color: #555;
             font-style: italic;
             margin: 8px 0;
-        }}
-        .paper-projects {{
+        }
+        .paper-projects {
             margin-top: 8px;
-        }}
-        .project-tag {{
+        }
+        .project-tag {
             display: inline-block;
             background-color: #3498db;
             color: white;
@@ -323,248 +183,531 @@ def generate_digest_html(
             font-size: 11px;
             margin-right: 5px;
             margin-bottom: 5px;
-        }}
-        .paper-links {{
+        }
+        .paper-links {
             margin-top: 12px;
             font-size: 13px;
-        }}
-        .paper-links a {{
+        }
+        .paper-links a {
             color: #3498db;
             text-decoration: none;
             margin-right: 15px;
-        }}
-        .paper-links a:hover {{
+        }
+        .paper-links a:hover {
             text-decoration: underline;
-        }}
-        .open-access {{
+        }
+        .open-access {
             color: #27ae60;
             font-weight: 500;
-        }}
-        .watched-author {{
+        }
+        .watched-author {
             background-color: #9b59b6;
             color: white;
             padding: 1px 6px;
             border-radius: 3px;
             font-size: 11px;
             margin-left: 5px;
-        }}
-        .section-empty {{
+        }
+        .section-empty {
             color: #888;
             font-style: italic;
             padding: 20px;
             text-align: center;
-        }}
-        .footer {{
+        }
+        .footer {
             margin-top: 30px;
             padding-top: 20px;
             border-top: 1px solid #eee;
             font-size: 12px;
             color: #888;
             text-align: center;
-        }}
-        @media (max-width: 600px) {{
-            body {{
+        }
+        @media (max-width: 600px) {
+            body {
                 padding: 10px;
-            }}
-            .container {{
+            }
+            .container {
                 padding: 15px;
-            }}
-            .stats {{
+            }
+            .stats {
                 gap: 15px;
-            }}
-        }}
-    </style>
+            }
+        }
+    </style>""")
+
+# Digest email template, compiled once at import. Autoescaping covers paper
+# titles, summaries and rationales, which may contain <, > or &.
+_DIGEST_TEMPLATE_SRC = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{{ title }}</title>
+    {{ digest_css }}
 </head>
 <body>
     <div class="container">
-        <h1>{title}</h1>
-        <p style="color: #666; margin-top: -10px;">{date_str}</p>
+        <h1>{{ title }}</h1>
+        <p style="color: #666; margin-top: -10px;">{{ date_str }}</p>
 
         <div class="stats">
             <div class="stat">
-                <div class="stat-number">{total}</div>
+                <div class="stat-number">{{ total }}</div>
                 <div class="stat-label">Papers</div>
             </div>
             <div class="stat">
-                <div class="stat-number" style="color: #e74c3c;">{len(high_priority)}</div>
+                <div class="stat-number" style="color: #e74c3c;">{{ high_priority|length }}</div>
                 <div class="stat-label">High Priority</div>
             </div>
             <div class="stat">
-                <div class="stat-number" style="color: #f39c12;">{len(moderate)}</div>
+                <div class="stat-number" style="color: #f39c12;">{{ moderate_count }}</div>
                 <div class="stat-label">Moderate</div>
             </div>
             <div class="stat">
-                <div class="stat-number" style="color: #27ae60;">{open_access}</div>
+                <div class="stat-number" style="color: #27ae60;">{{ open_access }}</div>
                 <div class="stat-label">Open Access</div>
             </div>
         </div>
-"""
+{% macro render_paper(p, priority_class, compact=False) %}
+{% set paper = p.paper %}
+{% set score = p.score %}
+        <div class="paper {{ priority_class }}">
+            <div class="paper-title">
+                <span class="score-badge {{ 'score-high' if score >= 0.7 else 'score-moderate' if score >= 0.4 else 'score-low' }}">{{ p.score_pct }}</span>
+                <a href="{{ paper.url }}" target="_blank">{{ paper.title }}</a>
+            </div>
+            <div class="paper-meta">
+                {{ p|authors_html }}<br>
+                <span class="journal">{{ paper.journal }}</span> &middot;
+                <span class="date">{{ paper.pub_date }}</span>
+{% if paper.is_open_access %}
+                &middot; <span class="open-access">Open Access</span>
+{% endif %}
+            </div>
+{% if not compact %}
+{% if paper.summary %}
+            <div class="paper-summary">
+                <strong>Summary:</strong> {{ paper.summary }}
+            </div>
+{% endif %}
+{% if paper.ranking_rationale %}
+            <div class="paper-rationale">
+                {{ paper.ranking_rationale }}
+            </div>
+{% endif %}
+{% if paper.matched_projects %}
+            <div class="paper-projects">
+{% for project in paper.matched_projects %}
+                <span class="project-tag">{{ project }}</span>
+{% endfor %}
+            </div>
+{% endif %}
+{% endif %}
+            <div class="paper-links">
+{% for label, url in p.links %}
+                <a href="{{ url }}" target="_blank">{{ label }}</a>
+{% endfor %}
+{% if p.star_link and p.dismiss_link %}
+                <span style="margin-left: 10px; padding-left: 10px; border-left: 1px solid #ddd;">
+                    <a href="{{ p.star_link }}" target="_blank" style="color: #f39c12;">Star</a>
+                    <a href="{{ p.dismiss_link }}" target="_blank" style="color: #95a5a6;">Dismiss</a>
+                </span>
+{% endif %}
+            </div>
+        </div>
+{% endmacro %}
 
-    # High Priority Section
-    html += """
         <h2>High Priority Papers</h2>
-"""
-    if high_priority:
-        for paper in high_priority:
-            html += _render_paper(paper, "high-priority", config, worker_url, signing_secret)
-    else:
-        html += '<p class="section-empty">No high priority papers this week.</p>'
+{% for p in high_priority %}
+{{ render_paper(p, "high-priority") }}
+{%- else %}
+        <p class="section-empty">No high priority papers this week.</p>
+{% endfor %}
 
-    # Moderate Section
-    html += """
         <h2>Moderate Relevance</h2>
-"""
-    if moderate:
-        for paper in moderate[:10]:  # Limit to 10
-            html += _render_paper(paper, "moderate", config, worker_url, signing_secret)
-        if len(moderate) > 10:
-            html += f'<p class="section-empty">...and {len(moderate) - 10} more moderate papers.</p>'
-    else:
-        html += '<p class="section-empty">No moderate relevance papers this week.</p>'
-
-    # Low Priority (collapsible with <details>)
-    if low_priority:
-        html += f"""
-        <h2>Low Priority ({len(low_priority)} papers)</h2>
+{% for p in moderate %}
+{{ render_paper(p, "moderate") }}
+{%- else %}
+        <p class="section-empty">No moderate relevance papers this week.</p>
+{% endfor %}
+{% if moderate_count > moderate|length %}
+        <p class="section-empty">...and {{ moderate_count - moderate|length }} more moderate papers.</p>
+{% endif %}
+{% if low_priority %}
+
+        <h2>Low Priority ({{ low_priority_count }} papers)</h2>
         <details style="margin-top: 10px;">
             <summary style="cursor: pointer; color: #3498db; font-size: 14px; padding: 10px 0;">
-                Click to show {len(low_priority)} lower-relevance papers
+                Click to show {{ low_priority_count }} lower-relevance papers
             </summary>
             <div style="margin-top: 10px;">
-"""
-        for paper in low_priority[:20]:
-            html += _render_paper(paper, "low-priority", config, worker_url, signing_secret, compact=True)
-        if len(low_priority) > 20:
-            html += f'<p class="section-empty">...and {len(low_priority) - 20} more papers.</p>'
-        html += """
+{% for p in low_priority %}
+{{ render_paper(p, "low-priority", compact=True) }}
+{%- endfor %}
+{% if low_priority_count > low_priority|length %}
+                <p class="section-empty">...and {{ low_priority_count - low_priority|length }} more papers.</p>
+{% endif %}
             </div>
         </details>
-"""
+{% endif %}
 
-    # Footer
-    html += f"""
         <div class="footer">
             Generated by Literature Monitor<br>
-            {datetime.now().strftime("%Y-%m-%d %H:%M")}
+            {{ generated_at }}
         </div>
     </div>
 </body>
 </html>
 """
 
-    return html
 
+def generate_hmac_signature(data: str, timestamp: str, secret: str) -> str:
+    """
+    Generate HMAC-SHA256 signature matching the Cloudflare Worker's algorithm.
+
+    Args:
+        data: Base64-encoded paper data.
+        timestamp: Unix timestamp in milliseconds.
+        secret: Signing secret.
+
+    Returns:
+        Hex-encoded HMAC signature.
+    """
+    # Copying a keyed HMAC reuses its key setup, which is the same for every link
+    mac = _keyed_hmac(secret).copy()
+    mac.update(f"{data}.{timestamp}".encode())
+    return mac.hexdigest()
+
+
+@functools.lru_cache(maxsize=4)
+def _keyed_hmac(secret: str) -> hmac.HMAC:
+    """HMAC-SHA256 object keyed with the secret, before any message is added."""
+    return hmac.new(secret.encode(), digestmod=hashlib.sha256)
 
-def _render_paper(
+
+def generate_feedback_link(
     paper: Paper,
-    priority_class: str,
-    config: Config,
+    action: str,
     worker_url: Optional[str] = None,
     signing_secret: Optional[str] = None,
-    compact: bool = False,
+    timestamp: Optional[str] = None,
+) -> Optional[str]:
+    """
+    Generate a one-click feedback link (star or dismiss) with HMAC signature.
+
+    Args:
+        paper: Paper to generate link for.
+        action: 'star' or 'dismiss'.
+        worker_url: Cloudflare Worker URL.
+        signing_secret: Secret for HMAC signing.
+        timestamp: Unix timestamp in milliseconds to sign (defaults to now).
+
+    Returns:
+        URL string or None if not configured.
+    """
+    if not worker_url or not signing_secret:
+        return None
+
+    # Encode minimal payload (just paper_id and title for confirmation)
+    metadata = {
+        "paper_id": paper.id,
+        "title": paper.title,
+    }
+    encoded = urlsafe_b64encode(
+        json.dumps(metadata).encode()
+    ).decode().rstrip('=')
+
+    timestamp = timestamp or str(int(time.time() * 1000))
+    signature = generate_hmac_signature(encoded, timestamp, signing_secret)
+
+    return f"{worker_url}/feedback?data={encoded}&ts={timestamp}&sig={signature}&action={action}"
+
+
+def generate_zotero_link(
+    paper: Paper,
+    worker_url: Optional[str] = None,
+    signing_secret: Optional[str] = None,
+    timestamp: Optional[str] = None,
+    payloads: Optional[dict[str, str]] = None,
 ) -> str:
-    """Render a single paper as HTML."""
-
-    # Score badge
-    score = paper.relevance_score or 0
-    if score >= 0.7:
-        score_class = "score-high"
-    elif score >= 0.4:
-        score_class = "score-moderate"
-    else:
-        score_class = "score-low"
-
-    # Check for watched authors
-    watched = []
-    for author in paper.authors:
-        for wa in config.watched_authors:
-            if wa.lower() in author.lower():
-                watched.append(author)
-                break
-
-    # Authors string
-    if len(paper.authors) > 3:
-        authors_str = ", ".join(paper.authors[:3]) + f" et al."
+    """
+    Generate a one-click Zotero add link with HMAC signature.
+
+    If worker_url and signing_secret are set, creates a signed link to the
+    Cloudflare Worker. Otherwise, falls back to DOI/paper URL.
+
+    Args:
+        paper: Paper to generate link for.
+        worker_url: Cloudflare Worker URL.
+        signing_secret: Secret for HMAC signing.
+        timestamp: Unix timestamp in milliseconds to sign (defaults to now).
+        payloads: Optional {paper_id: payload} memo shared across calls.
+
+    Returns:
+        URL string.
+    """
+    if worker_url and signing_secret:
+        encoded = _encode_paper_for_worker(paper, payloads)
+
+        # Generate timestamp and signature
+        timestamp = timestamp or str(int(time.time() * 1000))
+        signature = generate_hmac_signature(encoded, timestamp, signing_secret)
+
+        return f"{worker_url}/add?data={encoded}&ts={timestamp}&sig={signature}"
+
+    elif worker_url:
+        # Worker URL but no signing secret - generate unsigned (will fail at worker)
+        return f"{worker_url}/add?data={_encode_paper_for_worker(paper, payloads)}"
+
     else:
-        authors_str = ", ".join(paper.authors) if paper.authors else "Unknown authors"
+        # Fallback: link to DOI or paper URL
+        if paper.doi:
+            return f"https://doi.org/{paper.doi}"
+        return paper.url
 
-    # Add watched author badges
-    for w in watched:
-        authors_str = authors_str.replace(w, f'{w}<span class="watched-author">Watched</span>')
 
-    html = f"""
-        <div class="paper {priority_class}">
-            <div class="paper-title">
-                <span class="score-badge {score_class}">{score:.0%}</span>
-                <a href="{paper.url}" target="_blank">{paper.title}</a>
-            </div>
-            <div class="paper-meta">
-                {authors_str}<br>
-                <span class="journal">{paper.journal}</span> &middot;
-                <span class="date">{paper.pub_date}</span>
-                {' &middot; <span class="open-access">Open Access</span>' if paper.is_open_access else ''}
-            </div>
-"""
+def _categorize_papers(papers: list[Paper]) -> tuple[list[Paper], list[Paper], list[Paper], int]:
+    """
+    Split papers into priority buckets in a single pass.
 
-    if not compact:
-        if paper.summary:
-            html += f"""
-            <div class="paper-summary">
-                <strong>Summary:</strong> {paper.summary}
-            </div>
-"""
+    Returns:
+        Tuple of (high priority, moderate, low priority, open access count).
+        Unscored papers are left out of the buckets but still counted.
+    """
+    high_priority, moderate, low_priority = [], [], []
+    open_access = 0
+    for paper in papers:
+        if paper.is_open_access:
+            open_access += 1
+        # Must check `is not None` since 0.0 is a valid score
+        score = paper.relevance_score
+        if score is None:
+            continue
+        if score >= 0.7:
+            high_priority.append(paper)
+        elif score >= 0.4:
+            moderate.append(paper)
+        else:
+            low_priority.append(paper)
+    return high_priority, moderate, low_priority, open_access
 
-        if paper.ranking_rationale:
-            html += f"""
-            <div class="paper-rationale">
-                {paper.ranking_rationale}
-            </div>
-"""
 
-        if paper.matched_projects:
-            html += '<div class="paper-projects">'
-            for project in paper.matched_projects:
-                html += f'<span class="project-tag">{project}</span>'
-            html += '</div>'
+def _encode_paper_for_worker(paper: Paper, payloads: Optional[dict[str, str]] = None) -> str:
+    """
+    Encode paper metadata for the worker's /add endpoint (URL-safe base64 JSON).
+
+    Args:
+        paper: Paper to encode.
+        payloads: Optional {paper_id: payload} memo to read from and fill.
+    """
+    encoded = payloads.get(paper.id) if payloads is not None else None
+    if encoded is None:
+        metadata = {
+            "title": paper.title,
+            "authors": paper.authors[:20],  # Limit authors to keep URL reasonable
+            "journal": paper.journal,
+            "date": paper.pub_date,
+            "doi": paper.doi,
+            "url": paper.url,
+        }
+        # The worker treats a missing abstract as empty
+        if paper.abstract:
+            metadata["abstract"] = paper.abstract[:500]
+        # Compact and ASCII-only: the worker decodes with atob(), which
+        # yields Latin-1, not UTF-8
+        encoded = urlsafe_b64encode(
+            fastjson.dumps_ascii(metadata)
+        ).decode().rstrip('=')  # Remove padding for cleaner URLs
+        if payloads is not None:
+            payloads[paper.id] = encoded
+    return encoded
+
+
+@dataclass
+class RenderedPaper:
+    """A digest paper with the display values both formats share, computed once."""
+    paper: Paper
+    score: float
+    score_pct: str
+    authors: list[str]  # Authors shown (first 3)
+    authors_str: str  # Plain-text author line, e.g. "A, B, C et al."
+    watched: list[str]  # Watched authors among all of the paper's authors
+    links: list[tuple[str, str]]  # (label, URL) for each link the paper has
+    star_link: Optional[str]
+    dismiss_link: Optional[str]
+
+
+@dataclass
+class PreparedDigest:
+    """Digest papers split by priority, ready for HTML or Markdown rendering."""
+    high_priority: list[RenderedPaper]
+    moderate: list[RenderedPaper]  # Only the first MODERATE_SHOWN
+    low_priority: list[RenderedPaper]  # Only the first LOW_PRIORITY_SHOWN
+    moderate_count: int
+    low_priority_count: int
+    total: int
+    open_access: int
+    now: datetime
+
+
+# How many moderate / low priority papers a digest lists before "...and N more"
+MODERATE_SHOWN = 10
+LOW_PRIORITY_SHOWN = 20
+
+
+def prepare_digest(
+    papers: list[Paper],
+    config: Config,
+    worker_url: Optional[str] = None,
+    signing_secret: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> PreparedDigest:
+    """
+    Categorize papers and precompute everything the digest shows for each.
 
-    # Links
-    zotero_link = generate_zotero_link(paper, worker_url, signing_secret)
+    Watched-author matching, author formatting and link signing run once per
+    paper here (and only for papers the digest lists), so rendering both the
+    HTML and Markdown versions doesn't repeat them.
 
-    # Feedback links
-    star_link = generate_feedback_link(paper, "star", worker_url, signing_secret)
-    dismiss_link = generate_feedback_link(paper, "dismiss", worker_url, signing_secret)
+    Args:
+        papers: List of ranked papers (should be sorted by relevance).
+        config: Application config.
+        worker_url: Optional Zotero worker URL.
+        signing_secret: Secret for signing Zotero links.
+        now: Time to date the digest with (defaults to now).
 
-    feedback_links = ""
-    if star_link and dismiss_link:
-        feedback_links = f"""
-                <span style="margin-left: 10px; padding-left: 10px; border-left: 1px solid #ddd;">
-                    <a href="{star_link}" target="_blank" style="color: #f39c12;">Star</a>
-                    <a href="{dismiss_link}" target="_blank" style="color: #95a5a6;">Dismiss</a>
-                </span>"""
+    Returns:
+        PreparedDigest for render_digest_html / render_digest_markdown.
+    """
+    high_priority, moderate, low_priority, open_access = _categorize_papers(papers)
+    # Every link in one digest is signed with the same timestamp
+    timestamp = str(int(time.time() * 1000))
+    # Worker payloads for this digest only, so edits to a paper never go stale
+    payloads: dict[str, str] = {}
+
+    def render(paper: Paper) -> RenderedPaper:
+        score = paper.relevance_score or 0
+        authors = paper.authors[:3]
+        if len(paper.authors) > 3:
+            authors_str = ", ".join(authors) + " et al."
+        else:
+            authors_str = ", ".join(authors) if authors else "Unknown authors"
 
-    html += f"""
-            <div class="paper-links">
-                <a href="{paper.url}" target="_blank">View Paper</a>
-                {f'<a href="{paper.full_text_url}" target="_blank">Full Text (PDF)</a>' if paper.full_text_url else ''}
-                {f'<a href="https://doi.org/{paper.doi}" target="_blank">DOI</a>' if paper.doi else ''}
-                <a href="{zotero_link}" target="_blank">Add to Zotero</a>{feedback_links}
-            </div>
-        </div>
-"""
+        # Only the links this paper has, so the template just loops over them
+        links = [("View Paper", paper.url)]
+        if paper.full_text_url:
+            links.append(("Full Text (PDF)", paper.full_text_url))
+        if paper.doi:
+            links.append(("DOI", f"https://doi.org/{paper.doi}"))
+        links.append(("Add to Zotero", generate_zotero_link(paper, worker_url, signing_secret, timestamp, payloads)))
+
+        return RenderedPaper(
+            paper=paper,
+            score=score,
+            score_pct=f"{score:.0%}",
+            authors=authors,
+            authors_str=authors_str,
+            watched=config.match_watched_authors(paper.authors),
+            links=links,
+            star_link=generate_feedback_link(paper, "star", worker_url, signing_secret, timestamp),
+            dismiss_link=generate_feedback_link(paper, "dismiss", worker_url, signing_secret, timestamp),
+        )
+
+    return PreparedDigest(
+        high_priority=[render(paper) for paper in high_priority],
+        moderate=[render(paper) for paper in moderate[:MODERATE_SHOWN]],
+        low_priority=[render(paper) for paper in low_priority[:LOW_PRIORITY_SHOWN]],
+        moderate_count=len(moderate),
+        low_priority_count=len(low_priority),
+        total=len(papers),
+        open_access=open_access,
+        # One clock reading, so the header and footer can't straddle midnight
+        now=now or datetime.now(),
+    )
 
-    return html
+
+def _authors_html(rendered: RenderedPaper) -> Markup:
+    """Escaped author line with a badge after each watched author."""
+    if not rendered.authors:
+        return Markup("Unknown authors")
+
+    authors_html = Markup(", ").join(
+        escape(author) + _WATCHED_BADGE if author in rendered.watched else escape(author)
+        for author in rendered.authors
+    )
+    if len(rendered.paper.authors) > 3:
+        authors_html += " et al."
+    return authors_html
+
+
+_WATCHED_BADGE = Markup('<span class="watched-author">Watched</span>')
+
+
+# Globals and filters give the template its stylesheet and author formatting
+_DIGEST_ENV = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True)
+_DIGEST_ENV.globals["digest_css"] = _DIGEST_CSS
+_DIGEST_ENV.filters["authors_html"] = _authors_html
+_DIGEST_TEMPLATE = _DIGEST_ENV.from_string(_DIGEST_TEMPLATE_SRC)
+
+
+def generate_digest_html(
+    papers: list[Paper],
+    config: Config,
+    title: str = "Literature Monitor Digest",
+    worker_url: Optional[str] = None,
+    signing_secret: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> str:
+    """
+    Generate an HTML email digest of ranked papers.
+
+    Args:
+        papers: List of ranked papers (should be sorted by relevance).
+        config: Application config.
+        title: Email subject/title.
+        worker_url: Optional Zotero worker URL.
+        signing_secret: Secret for signing Zotero links.
+        now: Time to date the digest with (defaults to now).
+
+    Returns:
+        HTML string for the email.
+    """
+    digest = prepare_digest(papers, config, worker_url, signing_secret, now)
+    return "".join(render_digest_html(digest, title))
+
+
+def render_digest_html(digest: PreparedDigest, title: str = "Literature Monitor Digest") -> Iterator[str]:
+    """
+    Render a prepared digest as HTML, as a stream of chunks.
+
+    The HTML is produced as the iterator is consumed, so it can be written
+    out without building the whole document in memory.
+    """
+    return _DIGEST_TEMPLATE.generate(
+        title=title,
+        date_str=digest.now.strftime("%B %d, %Y"),
+        generated_at=digest.now.strftime("%Y-%m-%d %H:%M"),
+        total=digest.total,
+        open_access=digest.open_access,
+        high_priority=digest.high_priority,
+        moderate=digest.moderate,
+        low_priority=digest.low_priority,
+        moderate_count=digest.moderate_count,
+        low_priority_count=digest.low_priority_count,
+    )
 
 
 def save_digest(
-    html: str,
-    output_dir: str | Path = "output",
+    html: Union[str, Iterable[str]],
+    output_dir: Union[str, Path] = "output",
     filename: Optional[str] = None,
 ) -> Path:
     """
     Save the digest HTML to a file.
 
     Args:
-        html: HTML content.
+        html: HTML content, or an iterable of chunks (e.g. from
+              render_digest_html) to write as they're produced.
         output_dir: Directory to save to.
         filename: Optional filename (defaults to digest_YYYY-MM-DD.html).
 
@@ -578,11 +721,131 @@ def save_digest(
         filename = f"digest_{datetime.now().strftime('%Y-%m-%d')}.html"
 
     output_path = output_dir / filename
-    output_path.write_text(html, encoding="utf-8")
+    with output_path.open("w", encoding="utf-8", buffering=1 << 20) as f:
+        if isinstance(html, str):
+            f.write(html)
+        else:
+            f.writelines(html)
 
     return output_path
 
 
+class SmtpSender:
+    """
+    Sends digest emails over one authenticated SMTP connection.
+
+    The connection is opened on the first send and reused for later ones;
+    if the server has dropped it in between (checked with NOOP), it is
+    reopened. Use as a context manager, or call close() when done.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        from_email: Optional[str] = None,
+    ):
+        """
+        Args:
+            host: SMTP server.
+            port: SMTP port (STARTTLS is used).
+            user: SMTP username.
+            password: SMTP password.
+            from_email: Sender address for every message.
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.from_email = from_email
+        self._server: Optional[smtplib.SMTP] = None
+
+    def _connection(self) -> smtplib.SMTP:
+        """Return a live, logged-in connection, reconnecting if needed."""
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except smtplib.SMTPException:
+                pass
+            self.close()
+
+        server = smtplib.SMTP(self.host, self.port)
+        try:
+            server.starttls()
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except BaseException:
+            server.close()
+            raise
+        self._server = server
+        return server
+
+    def send(self, html: str, subject: str, to_email: str):
+        """
+        Send one HTML digest (with a plain-text fallback part).
+
+        Raises:
+            smtplib.SMTPException or OSError if sending fails.
+        """
+        msg = EmailMessage()
+        msg["Subject"] = subject
+        msg["From"] = self.from_email
+        msg["To"] = to_email
+
+        # Plain text fallback, then the HTML as the preferred alternative
+        text_content = f"View this email in HTML format.\n\nSubject: {subject}"
+        msg.set_content(text_content)
+        msg.add_alternative(html, subtype="html")
+
+        # send_message serializes straight to bytes (no intermediate
+        # as_string() copy that sendmail would then encode again)
+        self._connection().send_message(msg)
+
+    def close(self):
+        """Close the connection if one is open."""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                self._server.close()
+            self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def create_smtp_sender(
+    from_email: Optional[str] = None,
+    smtp_host: Optional[str] = None,
+    smtp_port: int = 587,
+    smtp_user: Optional[str] = None,
+    smtp_password: Optional[str] = None,
+) -> Optional[SmtpSender]:
+    """
+    Create an SmtpSender, filling unset arguments from the environment.
+
+    Returns:
+        SmtpSender (not yet connected), or None if SMTP is not configured.
+    """
+    # Load from environment if not provided
+    from_email = from_email or os.getenv("EMAIL_FROM")
+    smtp_host = smtp_host or os.getenv("SMTP_HOST")
+    smtp_user = smtp_user or os.getenv("SMTP_USER")
+    smtp_password = smtp_password or os.getenv("SMTP_PASSWORD")
+
+    if not all([from_email, smtp_host, smtp_user, smtp_password]):
+        print("SMTP not configured. Set EMAIL_FROM, SMTP_HOST, SMTP_USER, SMTP_PASSWORD.")
+        return None
+
+    return SmtpSender(smtp_host, smtp_port, smtp_user, smtp_password, from_email)
+
+
 def send_digest_email(
     html: str,
     subject: str,
@@ -592,6 +855,7 @@ def send_digest_email(
     smtp_port: int = 587,
     smtp_user: Optional[str] = None,
     smtp_password: Optional[str] = None,
+    sender: Optional[SmtpSender] = None,
 ) -> bool:
     """
     Send the digest via SMTP.
@@ -605,36 +869,21 @@ def send_digest_email(
         smtp_port: SMTP port (defaults to 587).
         smtp_user: SMTP username (defaults to SMTP_USER env var).
         smtp_password: SMTP password (defaults to SMTP_PASSWORD env var).
+        sender: Open SmtpSender to send through (left open afterwards). When
+            given, the other SMTP arguments are ignored.
 
     Returns:
         True if sent successfully, False otherwise.
     """
-    # Load from environment if not provided
-    from_email = from_email or os.getenv("EMAIL_FROM")
-    smtp_host = smtp_host or os.getenv("SMTP_HOST")
-    smtp_user = smtp_user or os.getenv("SMTP_USER")
-    smtp_password = smtp_password or os.getenv("SMTP_PASSWORD")
-
-    if not all([from_email, smtp_host, smtp_user, smtp_password]):
-        print("SMTP not configured. Set EMAIL_FROM, SMTP_HOST, SMTP_USER, SMTP_PASSWORD.")
-        return False
+    if sender is None:
+        sender = create_smtp_sender(from_email, smtp_host, smtp_port, smtp_user, smtp_password)
+        if sender is None:
+            return False
+        with sender:
+            return send_digest_email(html, subject, to_email, sender=sender)
 
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = from_email
-        msg["To"] = to_email
-
-        # Plain text fallback
-        text_content = f"View this email in HTML format.\n\nSubject: {subject}"
-        msg.attach(MIMEText(text_content, "plain"))
-        msg.attach(MIMEText(html, "html"))
-
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.sendmail(from_email, to_email, msg.as_string())
-
+        sender.send(html, subject, to_email)
         return True
 
     except Exception as e:
@@ -646,6 +895,7 @@ def generate_digest_markdown(
     papers: list[Paper],
     config: Config,
     title: str = "Literature Monitor Digest",
+    now: Optional[datetime] = None,
 ) -> str:
     """
     Generate a Markdown version of the digest for Capacities.
@@ -654,107 +904,89 @@ def generate_digest_markdown(
         papers: List of ranked papers (should be sorted by relevance).
         config: Application config.
         title: Digest title.
+        now: Time to date the digest with (defaults to now).
 
     Returns:
         Markdown string.
     """
-    # Categorize papers
-    high_priority = [p for p in papers if p.relevance_score is not None and p.relevance_score >= 0.7]
-    moderate = [p for p in papers if p.relevance_score is not None and 0.4 <= p.relevance_score < 0.7]
-    low_priority = [p for p in papers if p.relevance_score is not None and p.relevance_score < 0.4]
+    return render_digest_markdown(prepare_digest(papers, config, now=now), title)
+
 
-    date_str = datetime.now().strftime("%B %d, %Y")
+def render_digest_markdown(digest: PreparedDigest, title: str = "Literature Monitor Digest") -> str:
+    """Render a prepared digest as Markdown."""
+    date_str = digest.now.strftime("%B %d, %Y")
 
-    md = f"# {title}\n\n"
-    md += f"*{date_str}*\n\n"
+    parts = [f"# {title}\n\n", f"*{date_str}*\n\n"]
 
     # Stats
-    total = len(papers)
-    md += f"**{total} papers** | "
-    md += f"**{len(high_priority)} high priority** | "
-    md += f"**{len(moderate)} moderate** | "
-    md += f"**{len(low_priority)} low priority**\n\n"
+    parts.append(f"**{digest.total} papers** | ")
+    parts.append(f"**{len(digest.high_priority)} high priority** | ")
+    parts.append(f"**{digest.moderate_count} moderate** | ")
+    parts.append(f"**{digest.low_priority_count} low priority**\n\n")
 
-    md += "---\n\n"
+    parts.append("---\n\n")
 
     # High Priority
-    if high_priority:
-        md += "## High Priority\n\n"
-        for paper in high_priority:
-            md += _render_paper_markdown(paper, config)
-        md += "\n"
+    if digest.high_priority:
+        parts.append("## High Priority\n\n")
+        for rendered in digest.high_priority:
+            _append_paper_markdown(parts, rendered)
+        parts.append("\n")
 
     # Moderate
-    if moderate:
-        md += "## Moderate Relevance\n\n"
-        for paper in moderate[:10]:
-            md += _render_paper_markdown(paper, config)
-        if len(moderate) > 10:
-            md += f"*...and {len(moderate) - 10} more moderate papers.*\n\n"
+    if digest.moderate:
+        parts.append("## Moderate Relevance\n\n")
+        for rendered in digest.moderate:
+            _append_paper_markdown(parts, rendered)
+        if digest.moderate_count > len(digest.moderate):
+            parts.append(f"*...and {digest.moderate_count - len(digest.moderate)} more moderate papers.*\n\n")
 
     # Low Priority (abbreviated)
-    if low_priority:
-        md += f"## Low Priority ({len(low_priority)} papers)\n\n"
-        for paper in low_priority[:5]:
-            md += _render_paper_markdown(paper, config, compact=True)
-        if len(low_priority) > 5:
-            md += f"*...and {len(low_priority) - 5} more low priority papers.*\n\n"
+    if digest.low_priority:
+        parts.append(f"## Low Priority ({digest.low_priority_count} papers)\n\n")
+        for rendered in digest.low_priority[:5]:
+            _append_paper_markdown(parts, rendered, compact=True)
+        if digest.low_priority_count > 5:
+            parts.append(f"*...and {digest.low_priority_count - 5} more low priority papers.*\n\n")
 
-    return md
+    return "".join(parts)
 
 
-def _render_paper_markdown(
-    paper: Paper,
-    config: Config,
+def _append_paper_markdown(
+    parts: list[str],
+    rendered: RenderedPaper,
     compact: bool = False,
-) -> str:
+):
     """Render a single paper as Markdown (no URLs to avoid Capacities auto-linking)."""
-    score = paper.relevance_score or 0
-    score_str = f"{score:.0%}"
+    paper = rendered.paper
 
-    # Authors
-    if len(paper.authors) > 3:
-        authors_str = ", ".join(paper.authors[:3]) + " et al."
-    else:
-        authors_str = ", ".join(paper.authors) if paper.authors else "Unknown authors"
-
-    # Check for watched authors
-    watched = []
-    for author in paper.authors:
-        for wa in config.watched_authors:
-            if wa.lower() in author.lower():
-                watched.append(author)
-                break
+    parts.append(f"### {paper.title}\n\n")
+    parts.append(f"**Score: {rendered.score_pct}** | {rendered.authors_str}\n\n")
+    parts.append(f"*{paper.journal}* — {paper.pub_date}")
 
-    md = f"### {paper.title}\n\n"
-    md += f"**Score: {score_str}** | {authors_str}\n\n"
-    md += f"*{paper.journal}* — {paper.pub_date}"
-
-    if watched:
-        md += f" | **Watched:** {', '.join(watched)}"
+    if rendered.watched:
+        parts.append(f" | **Watched:** {', '.join(rendered.watched)}")
 
     if paper.is_open_access:
-        md += " | Open Access"
+        parts.append(" | Open Access")
 
     # Add DOI as plain text reference (not a link)
     if paper.doi:
-        md += f" | DOI: {paper.doi}"
+        parts.append(f" | DOI: {paper.doi}")
 
-    md += "\n\n"
+    parts.append("\n\n")
 
     if not compact:
         if paper.summary:
-            md += f"> {paper.summary}\n\n"
+            parts.append(f"> {paper.summary}\n\n")
 
         if paper.ranking_rationale:
-            md += f"*{paper.ranking_rationale}*\n\n"
+            parts.append(f"*{paper.ranking_rationale}*\n\n")
 
         if paper.matched_projects:
-            md += f"**Projects:** {', '.join(paper.matched_projects)}\n\n"
-
-    md += "---\n\n"
+            parts.append(f"**Projects:** {', '.join(paper.matched_projects)}\n\n")
 
-    return md
+    parts.append("---\n\n")
 
 
 def save_to_capacities_daily_note(
@@ -781,7 +1013,7 @@ def save_to_capacities_daily_note(
         return False
 
     try:
-        response = requests.post(
+        response = _get_capacities_session().post(
             f"{CAPACITIES_API_BASE}/save-to-daily-note",
             headers={
                 "Authorization": f"Bearer {api_token}",
@@ -806,6 +1038,34 @@ def save_to_capacities_daily_note(
         return False
 
 
+def _get_capacities_session() -> requests.Session:
+    """Return the shared Capacities session, creating it on first use."""
+    global _capacities_session
+    if _capacities_session is None:
+        session = requests.Session()
+        # Retry only responses where the request can't have been applied
+        # (502/503); a 504 may have saved the note, and retrying would
+        # append it to the daily note twice
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503],
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(max_retries=retry))
+        _capacities_session = session
+    return _capacities_session
+
+
+def close_sessions():
+    """Close the shared HTTP session(s) held by this module."""
+    global _capacities_session
+    if _capacities_session is not None:
+        _capacities_session.close()
+        _capacities_session = None
+
+
 def generate_and_save_digest(
     db: PaperDatabase,
     config: Config,
@@ -850,28 +1110,42 @@ def generate_and_save_digest(
     if worker_url and not signing_secret:
         print("Warning: ZOTERO_WORKER_URL set but SIGNING_SECRET missing. Zotero links will not work.")
 
-    # Generate HTML
-    title = f"Literature Monitor - Week of {datetime.now().strftime('%B %d, %Y')}"
-    html = generate_digest_html(
+    # Generate HTML (title, page dates and filename all from one clock reading)
+    now = datetime.now()
+    date_str = now.strftime("%B %d, %Y")
+    title = f"Literature Monitor - Week of {date_str}"
+    # Per-paper work runs once and feeds both the HTML and Markdown versions
+    digest = prepare_digest(
         ranked, config,
-        title=title,
         worker_url=worker_url,
         signing_secret=signing_secret,
+        now=now,
     )
+    chunks = render_digest_html(digest, title)
+    # Email needs the whole document; otherwise stream it straight to the file
+    html = "".join(chunks) if send_email else chunks
 
     # Save to file
-    output_path = save_digest(html, output_dir=output_dir)
+    output_path = save_digest(
+        html, output_dir=output_dir, filename=f"digest_{now.strftime('%Y-%m-%d')}.html"
+    )
     print(f"Digest saved to: {output_path}")
 
     # Optionally send email
     if send_email:
         to = to_email or config.email_to or os.getenv("EMAIL_TO")
-        if to:
-            if send_digest_email(html, subject=title, to_email=to):
-                print(f"Digest emailed to: {to}")
-            else:
-                print("Failed to send email (check SMTP settings)")
-        else:
+        # Comma-separated recipients each get their own copy
+        recipients = [addr.strip() for addr in (to or "").split(",") if addr.strip()]
+        sender = create_smtp_sender() if recipients else None
+        if sender is not None:
+            # One connection (and one STARTTLS/login) for every recipient
+            with sender:
+                for recipient in recipients:
+                    if send_digest_email(html, subject=title, to_email=recipient, sender=sender):
+                        print(f"Digest emailed to: {recipient}")
+                    else:
+                        print(f"Failed to email {recipient} (check SMTP settings)")
+        elif not recipients:
             print("No recipient email configured (set EMAIL_TO)")
 
     # Mark all papers as digested so they don't appear in future digests
@@ -884,7 +1158,7 @@ def generate_and_save_digest(
         capacities_space = os.getenv("CAPACITIES_SPACE_ID")
 
         if capacities_token and capacities_space:
-            markdown = generate_digest_markdown(ranked, config, title=title)
+            markdown = render_digest_markdown(digest, title)
             if save_to_capacities_daily_note(markdown):
                 print("Digest saved to Capacities daily note")
             else:
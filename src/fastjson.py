@@ -0,0 +1,43 @@
+"""
+JSON helpers that use orjson when it's installed, falling back to the stdlib.
+
+orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+catching json.JSONDecodeError either way.
+"""
+
+import json
+from typing import Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data: Union[str, bytes]):
+    """Parse a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        # Like json.dumps, accept int/float/bool dict keys
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps_ascii(obj) -> bytes:
+    """
+    Serialize to compact JSON bytes with non-ASCII characters \\u-escaped.
+
+    orjson always writes raw UTF-8, so its output is used only when it is
+    already pure ASCII; otherwise this falls back to json.dumps.
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj)
+        if data.isascii():
+            return data
+    return json.dumps(obj, separators=(",", ":")).encode()
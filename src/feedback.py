@@ -5,14 +5,27 @@ Builds feedback examples for the ranking prompt and syncs
 feedback from the Cloudflare Worker.
 """
 
+import heapq
 import os
 from typing import Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from . import fastjson
 from .database import PaperDatabase
 from .sources.pubmed import Paper
 
+# Weight of informativeness vs. project diversity when selecting examples
+_DIVERSITY_LAMBDA = 0.7
+
+# Maximum KV keys acknowledged per request to the Worker
+ACK_BATCH_SIZE = 100
+
+# Shared across syncs so the pending fetch and the ack reuse one connection
+_worker_session: Optional[requests.Session] = None
+
 
 def build_feedback_prompt_section(db: PaperDatabase) -> Optional[str]:
     """
@@ -70,7 +83,8 @@ def _select_examples(papers: list[Paper], max_count: int = 5) -> list[Paper]:
 
     Prioritizes papers where the score disagreed with feedback (e.g., high-scored
     but dismissed, or low-scored but starred) as these are most calibrating.
-    Also ensures diversity across projects.
+    Papers whose projects are already represented are penalized, so the
+    examples spread across projects.
     """
     if not papers:
         return []
@@ -86,24 +100,42 @@ def _select_examples(papers: list[Paper], max_count: int = 5) -> list[Paper]:
         else:
             return score  # High score + dismiss = very informative
 
-    # Sort by informativeness (most informative first)
-    sorted_papers = sorted(papers, key=informativeness, reverse=True)
+    # Only the most informative candidates can realistically be picked, so
+    # keep the top few per slot (nlargest is stable, so ties stay most recent
+    # first) and leave the rest out of the diversity pass
+    candidates = heapq.nlargest(max_count * 3, papers, key=informativeness)
+
+    # Encode each candidate's projects as a bitmask, so overlap with the
+    # projects already covered is an AND plus a popcount
+    project_bits = {}
+    masks = []
+    for paper in candidates:
+        mask = 0
+        for project in paper.matched_projects or ():
+            mask |= 1 << project_bits.setdefault(project, len(project_bits))
+        masks.append(mask)
+    scores = [informativeness(paper) for paper in candidates]
+
+    # Greedy maximal-marginal-relevance selection: each pick trades
+    # informativeness against how much of the paper's project set is
+    # already covered by earlier picks
+    def marginal_value(i):
+        mask = masks[i]
+        # bin().count("1") rather than int.bit_count(), which needs Python 3.10
+        overlap = bin(mask & covered).count("1") / bin(mask).count("1") if mask else 0.0
+        return _DIVERSITY_LAMBDA * scores[i] - (1 - _DIVERSITY_LAMBDA) * overlap
 
-    # Select diverse examples across projects
     selected = []
-    seen_projects = set()
-
-    for paper in sorted_papers:
-        if len(selected) >= max_count:
-            break
-
-        # Prefer papers from projects not yet represented
-        paper_projects = frozenset(paper.matched_projects) if paper.matched_projects else frozenset()
-        is_new_project = not paper_projects or not paper_projects.issubset(seen_projects)
+    remaining = list(range(len(candidates)))
+    covered = 0
 
-        if is_new_project or len(selected) < max_count:
-            selected.append(paper)
-            seen_projects.update(paper_projects)
+    while remaining and len(selected) < max_count:
+        # max() keeps the earliest of equal candidates, so ties go to the
+        # more informative (then more recent) paper
+        best = max(remaining, key=marginal_value)
+        remaining.remove(best)
+        selected.append(candidates[best])
+        covered |= masks[best]
 
     return selected
 
@@ -144,7 +176,7 @@ def sync_worker_feedback(db: PaperDatabase) -> int:
 
     # Fetch pending feedback from Worker
     try:
-        response = requests.get(
+        response = _get_worker_session().get(
             f"{worker_url}/feedback/pending",
             params={"key": feedback_key},
             timeout=15,
@@ -153,14 +185,15 @@ def sync_worker_feedback(db: PaperDatabase) -> int:
         if response.status_code != 200:
             return 0
 
-        entries = response.json().get("entries", [])
+        entries = fastjson.loads(response.content).get("entries", [])
         if not entries:
             return 0
 
     except Exception:
         return 0
 
-    # Apply each feedback entry
+    # Apply all feedback entries in one transaction
+    updates = []
     processed_keys = []
     for entry in entries:
         paper_id = entry.get("paper_id")
@@ -168,19 +201,46 @@ def sync_worker_feedback(db: PaperDatabase) -> int:
         kv_key = entry.get("key")
 
         if paper_id and action in ("star", "dismiss"):
-            db.set_feedback(paper_id, action)
+            updates.append((paper_id, action))
             if kv_key:
                 processed_keys.append(kv_key)
 
-    # Acknowledge processed entries
-    if processed_keys:
+    if updates:
+        db.set_feedback_many(updates)
+
+    # Acknowledge processed entries only after they're committed, in chunks
+    # so a large backlog doesn't become one oversized request
+    for i in range(0, len(processed_keys), ACK_BATCH_SIZE):
         try:
-            requests.post(
+            _get_worker_session().post(
                 f"{worker_url}/feedback/ack",
-                json={"keys": processed_keys, "key": feedback_key},
+                json={"keys": processed_keys[i:i + ACK_BATCH_SIZE], "key": feedback_key},
                 timeout=15,
             )
         except Exception:
             pass  # Best effort acknowledgement
 
     return len(processed_keys)
+
+
+def _get_worker_session() -> requests.Session:
+    """Return the shared Worker session, creating it on first use."""
+    global _worker_session
+    if _worker_session is None:
+        session = requests.Session()
+        # Both calls are safe to repeat: fetching pending entries is a read,
+        # and acknowledging the same keys twice just deletes them once
+        retry = Retry(
+            total=3,
+            # Retry only the statuses below; a timed-out request isn't
+            # repeated, so a hung server costs one timeout, not four
+            connect=0,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(max_retries=retry))
+        _worker_session = session
+    return _worker_session
@@ -0,0 +1,107 @@
+"""
+Helpers for JSON arrays streamed (and sometimes mangled) by the Claude API.
+
+Shared by the ranker and the config suggester.
+"""
+
+import json
+import re
+
+from . import fastjson
+
+# Matches a JSON string (kept as-is) or a comma right before a closing bracket
+_TRAILING_COMMA_RE = re.compile(r'("(?:\\.|[^"\\])*")|,\s*(?=[}\]])')
+
+
+def loads_lenient(text: str):
+    """Parse JSON, retrying once with trailing commas removed if it fails."""
+    try:
+        return fastjson.loads(text)
+    except json.JSONDecodeError:
+        repaired = _TRAILING_COMMA_RE.sub(lambda m: m.group(1) or "", text)
+        if repaired == text:
+            raise
+        return fastjson.loads(repaired)
+
+
+class IncrementalJsonArrayParser:
+    """
+    Incrementally extract the elements of a JSON array from streamed text.
+
+    The array starts at the first '[' followed (after optional whitespace) by
+    '{'. Text before it (a code fence, a wrapping {"suggestions": ...}, a
+    preamble such as "Here are [3] suggestions:") is skipped. Scanning state is kept between calls, so each character is
+    looked at once no matter how the text is chunked, and only the element
+    currently being received is buffered.
+    """
+
+    def __init__(self):
+        self._parts: list[str] = []  # Text of the unfinished element so far
+        self._in_element = False
+        self._depth = 0              # 0 = before the array, 1 = between elements
+        self._bracket_seen = False   # Before the array: last non-blank char was '['
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+
+    def feed(self, chunk: str) -> list[dict]:
+        """Add a chunk of text and return any newly completed object elements."""
+        if self._done:
+            return []
+
+        items = []
+        start = 0 if self._in_element else None  # Where the element begins in this chunk
+        for i, c in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif c == "\\":
+                    self._escaped = True
+                elif c == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                # Until the array starts, only a '[' that opens an object matters
+                if self._bracket_seen and c == "{":
+                    self._depth = 2
+                    self._in_element = True
+                    start = i
+                elif not c.isspace():
+                    self._bracket_seen = c == "["
+            elif c == '"':
+                self._in_string = True
+            elif c in "[{":
+                self._depth += 1
+                if self._depth == 2:
+                    self._in_element = True
+                    start = i
+            elif c in "]}":
+                self._depth -= 1
+                if self._depth == 1 and self._in_element:
+                    self._parts.append(chunk[start : i + 1])
+                    text = "".join(self._parts)
+                    self._parts = []
+                    self._in_element = False
+                    start = None
+                    try:
+                        element = loads_lenient(text)
+                    except json.JSONDecodeError:
+                        element = None
+                    if isinstance(element, dict):
+                        items.append(element)
+                elif self._depth == 0:
+                    self._done = True
+                    break
+
+        if self._in_element and start is not None:
+            self._parts.append(chunk[start:])
+        return items
+
+
+if __name__ == "__main__":
+    # Quick test: a bracketed preamble, streamed one character at a time
+    text = 'Here are [3] suggestions: [\n  {"a": 1}, {"b": [2]},\n  {"c": "]"}\n]'
+    parser = IncrementalJsonArrayParser()
+    items = [item for c in text for item in parser.feed(c)]
+    assert items == [{"a": 1}, {"b": [2]}, {"c": "]"}], items
+    assert IncrementalJsonArrayParser().feed('```json\n{"suggestions": [{"a": 1}]}') == [{"a": 1}]
+    print(f"Parsed {len(items)} items")
@@ -7,37 +7,57 @@ Supports:
 """
 
 import re
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from . import fastjson
 from .sources.pubmed import Paper, PubMedClient
 
 
-# DOI regex: starts with "10." followed by registrant code / suffix
-DOI_PATTERN = re.compile(r'^10\.\d{4,9}/[^\s]+$')
+# DOI regex: optional doi.org URL or "doi:" prefix, then the bare DOI
+# ("10." followed by registrant code / suffix) captured as group 1
+DOI_PATTERN = re.compile(r'^(?:https?://doi\.org/|doi:)?(10\.\d{4,9}/\S+)$', re.IGNORECASE)
+
+# Just the prefix, for cleaning identifiers that aren't well-formed DOIs
+DOI_PREFIX_PATTERN = re.compile(r'^(?:https?://doi\.org/|doi:)', re.IGNORECASE)
+
+# JATS XML tags that CrossRef sometimes leaves in abstracts
+JATS_TAG_PATTERN = re.compile(r'<[^>]+>')
 
 # PMID: purely numeric
 PMID_PATTERN = re.compile(r'^\d+$')
 
+# CrossRef's polite pool identifies clients by User-Agent
+CROSSREF_USER_AGENT = "LitMonitor/1.0 (mailto:litmonitor@example.com)"
+
+# Shared across lookups so keep-alive connections (and their TLS sessions)
+# are reused instead of reconnecting for every DOI/PMID
+_crossref_session: Optional[requests.Session] = None
+_pubmed_client: Optional[PubMedClient] = None
+
+# Seconds CrossRef has to answer a DOI lookup before PubMed is also tried
+CROSSREF_HEAD_START = 3.0
+
+# How long a cached lookup is reused before metadata is fetched again
+LOOKUP_CACHE_DAYS = 30
+
 
 def is_doi(identifier: str) -> bool:
-    """Check if identifier looks like a DOI."""
-    # Strip common DOI URL prefixes
-    cleaned = identifier.strip()
-    for prefix in ('https://doi.org/', 'http://doi.org/', 'doi:'):
-        if cleaned.lower().startswith(prefix):
-            cleaned = cleaned[len(prefix):]
-    return bool(DOI_PATTERN.match(cleaned))
+    """Check if identifier looks like a DOI (optionally as a DOI URL or prefixed)."""
+    return DOI_PATTERN.match(identifier.strip()) is not None
 
 
 def clean_doi(identifier: str) -> str:
     """Extract the bare DOI from a DOI URL or prefixed string."""
     cleaned = identifier.strip()
-    for prefix in ('https://doi.org/', 'http://doi.org/', 'doi:'):
-        if cleaned.lower().startswith(prefix):
-            cleaned = cleaned[len(prefix):]
-    return cleaned
+    match = DOI_PATTERN.match(cleaned)
+    if match:
+        return match.group(1)
+    return DOI_PREFIX_PATTERN.sub('', cleaned, count=1)
 
 
 def is_pmid(identifier: str) -> bool:
@@ -55,7 +75,7 @@ def fetch_paper_by_pmid(pmid: str) -> Optional[Paper]:
     Returns:
         Paper object or None if not found.
     """
-    client = PubMedClient()
+    client = _get_pubmed_client()
     papers = client.fetch_papers([pmid.strip()])
     return papers[0] if papers else None
 
@@ -72,28 +92,37 @@ def fetch_paper_by_doi(doi: str) -> Optional[Paper]:
     """
     doi = clean_doi(doi)
 
-    # Try CrossRef first
-    paper = _fetch_from_crossref(doi)
-    if paper:
-        return paper
+    # PubMed is only queried when CrossRef fails or is slow, so most lookups
+    # cost no NCBI quota. CrossRef's result is still preferred whenever it
+    # has one, so the same DOI always yields the same paper ID.
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        crossref = executor.submit(_fetch_from_crossref, doi)
+        try:
+            return crossref.result(timeout=CROSSREF_HEAD_START) or _fetch_from_pubmed_by_doi(doi)
+        except FutureTimeoutError:
+            pass
 
-    # Fallback: search PubMed by DOI
-    return _fetch_from_pubmed_by_doi(doi)
+        # CrossRef is slow: search PubMed meanwhile rather than after it
+        pubmed = executor.submit(_fetch_from_pubmed_by_doi, doi)
+        return crossref.result() or pubmed.result()
+    finally:
+        # Don't wait on a PubMed search whose result isn't needed
+        executor.shutdown(wait=False, cancel_futures=True)
 
 
 def _fetch_from_crossref(doi: str) -> Optional[Paper]:
     """Fetch paper metadata from CrossRef API."""
     try:
-        response = requests.get(
+        response = _get_crossref_session().get(
             f"https://api.crossref.org/works/{doi}",
-            headers={"User-Agent": "LitMonitor/1.0 (mailto:litmonitor@example.com)"},
             timeout=15,
         )
 
         if response.status_code != 200:
             return None
 
-        data = response.json().get("message", {})
+        data = fastjson.loads(response.content).get("message", {})
 
         # Extract title
         title_list = data.get("title", [])
@@ -133,7 +162,7 @@ def _fetch_from_crossref(doi: str) -> Optional[Paper]:
         abstract = data.get("abstract", "")
         # CrossRef abstracts sometimes have JATS XML tags
         if abstract:
-            abstract = re.sub(r'<[^>]+>', '', abstract).strip()
+            abstract = JATS_TAG_PATTERN.sub('', abstract).strip()
 
         # Build URL
         url = f"https://doi.org/{doi}"
@@ -166,7 +195,7 @@ def _fetch_from_crossref(doi: str) -> Optional[Paper]:
 def _fetch_from_pubmed_by_doi(doi: str) -> Optional[Paper]:
     """Search PubMed for a paper by DOI."""
     try:
-        client = PubMedClient()
+        client = _get_pubmed_client()
         pmids = client.search(f"{doi}[DOI]", max_results=1, days_back=36500)
         if pmids:
             papers = client.fetch_papers(pmids)
@@ -176,12 +205,59 @@ def _fetch_from_pubmed_by_doi(doi: str) -> Optional[Paper]:
     return None
 
 
-def lookup_paper(identifier: str) -> tuple[Optional[Paper], str]:
+def _get_crossref_session() -> requests.Session:
+    """Return the shared CrossRef session, creating it on first use."""
+    global _crossref_session
+    if _crossref_session is None:
+        session = requests.Session()
+        session.headers["User-Agent"] = CROSSREF_USER_AGENT
+        # CrossRef is prone to transient overload; lookups are read-only GETs,
+        # so retrying them with backoff is safe
+        retry = Retry(
+            total=3,
+            # Retry only the statuses below; a timed-out request isn't
+            # repeated, so a hung server costs one timeout, not four
+            connect=0,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+        _crossref_session = session
+    return _crossref_session
+
+
+def _get_pubmed_client() -> PubMedClient:
+    """Return the shared PubMed client (and its session), creating it on first use."""
+    global _pubmed_client
+    if _pubmed_client is None:
+        _pubmed_client = PubMedClient()
+    return _pubmed_client
+
+
+def _cached_lookup(db, key: str, fetch: Callable[[], Optional[Paper]]) -> Optional[Paper]:
+    """Return the paper cached under key in db, or fetch it and cache the result."""
+    if db is not None:
+        paper = db.get_cached_lookup(key, max_age_days=LOOKUP_CACHE_DAYS)
+        if paper:
+            return paper
+
+    paper = fetch()
+    # Only successes are cached, so a transient CrossRef/PubMed failure
+    # doesn't hide the paper until the entry expires
+    if paper and db is not None:
+        db.put_cached_lookup(key, paper)
+    return paper
+
+
+def lookup_paper(identifier: str, db=None) -> tuple[Optional[Paper], str]:
     """
     Look up a paper by DOI or PMID, auto-detecting the type.
 
     Args:
         identifier: DOI or PMID string.
+        db: Optional PaperDatabase used to cache lookups across runs.
 
     Returns:
         Tuple of (Paper or None, source_type string).
@@ -190,16 +266,23 @@ def lookup_paper(identifier: str) -> tuple[Optional[Paper], str]:
     identifier = identifier.strip()
 
     if is_pmid(identifier):
-        paper = fetch_paper_by_pmid(identifier)
+        paper = _cached_lookup(db, f"pmid:{identifier}", lambda: fetch_paper_by_pmid(identifier))
         return paper, "pmid_lookup"
 
+    # DOIs are case-insensitive, so normalize the cache key
+    doi = clean_doi(identifier)
+    doi_key = f"doi:{doi.lower()}"
+
     if is_doi(identifier):
-        paper = fetch_paper_by_doi(identifier)
+        paper = _cached_lookup(db, doi_key, lambda: fetch_paper_by_doi(identifier))
         return paper, "doi_lookup"
 
-    # Try treating it as a DOI anyway (might have unusual format)
-    paper = fetch_paper_by_doi(identifier)
-    if paper:
-        return paper, "doi_lookup"
+    # Try treating it as a DOI anyway (might have unusual format), but only
+    # if it could plausibly be one; otherwise junk input would wait on
+    # CrossRef and then PubMed before failing
+    if doi.startswith("10.") and "/" in doi:
+        paper = _cached_lookup(db, doi_key, lambda: fetch_paper_by_doi(identifier))
+        if paper:
+            return paper, "doi_lookup"
 
     return None, "unknown"
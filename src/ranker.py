@@ -2,20 +2,40 @@
 Paper ranker using Claude API for summarization and relevance scoring.
 """
 
+import asyncio
+import functools
 import json
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 import anthropic
 
 from .config_loader import Config
+from .jsonstream import IncrementalJsonArrayParser
 from .sources.pubmed import Paper
 
+# Ranking requests in flight at once. Each call is pure network/model latency,
+# so overlapping them cuts wall-clock time roughly by this factor until the
+# API's rate limits push back (the SDK retries 429s with backoff).
+RANKING_CONCURRENCY = 5
 
-@dataclass
+# Progress bars for scores 0.0-1.0 in tenths, indexed by int(score * 10)
+_SCORE_BARS = ["█" * i + "░" * (10 - i) for i in range(11)]
+
+# Fields requested for each paper, shared by single and batch prompts
+_RESULT_FIELDS = """- "summary": A 2-3 sentence summary focusing on key findings and methods (not just restating the title)
+- "relevance_score": A number from 0.0 to 1.0 indicating relevance to the researcher's interests (0.7+ = high priority, 0.4-0.7 = moderate, <0.4 = low)
+- "ranking_rationale": A brief explanation of the score (1-2 sentences)
+- "matched_projects": An array of project names this paper is relevant to (can be empty)"""
+
+
+@dataclass(frozen=True)
 class RankingResult:
     """Result of ranking a paper."""
+    # Spelled out because dataclass(slots=True) needs Python 3.10
+    __slots__ = ("summary", "relevance_score", "ranking_rationale", "matched_projects")
+
     summary: str
     relevance_score: float  # 0.0 to 1.0
     ranking_rationale: str
@@ -31,6 +51,7 @@ class PaperRanker:
         api_key: Optional[str] = None,
         model: str = "claude-sonnet-4-6",
         db=None,
+        max_concurrency: int = RANKING_CONCURRENCY,
     ):
         """
         Initialize the ranker.
@@ -40,10 +61,13 @@ class PaperRanker:
             api_key: Anthropic API key (defaults to ANTHROPIC_API_KEY env var).
             model: Claude model to use.
             db: Optional PaperDatabase for feedback-informed ranking.
+            max_concurrency: Maximum ranking requests in flight in rank_papers.
         """
         self.config = config
         self.model = model
-        self.client = anthropic.Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+        self.max_concurrency = max_concurrency
+        self._api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
+        self.client = anthropic.Anthropic(api_key=self._api_key)
 
         # Build feedback section once at init
         self._feedback_section = None
@@ -54,6 +78,23 @@ class PaperRanker:
             except Exception:
                 pass
 
+        # Journal names repeat heavily within a run, and each paper's weight is
+        # needed for both its prompt and its score
+        self._journal_weight = functools.lru_cache(maxsize=4096)(self.config.get_journal_weight)
+
+        # Paper-independent prompt text is built once here rather than per request
+        self._project_names = str([p.name for p in self.config.active_projects])
+
+        # The system prompt is the same for every paper, so build it once and
+        # mark it cacheable: later requests in a run read it from Anthropic's
+        # prompt cache instead of paying to process it again
+        self._system_prompt = self._build_system_prompt()
+        self._system = [{
+            "type": "text",
+            "text": self._system_prompt,
+            "cache_control": {"type": "ephemeral"},
+        }]
+
     def _build_system_prompt(self) -> str:
         """Build the system prompt with research context."""
         projects_text = "\n".join(
@@ -85,30 +126,26 @@ When evaluating papers:
 
         return prompt
 
-    def _build_user_prompt(self, paper: Paper) -> str:
-        """Build the user prompt for a single paper."""
+    def _describe_paper(self, paper: Paper) -> str:
+        """Format a paper's metadata and abstract for a ranking prompt."""
         authors_str = ", ".join(paper.authors[:5])
         if len(paper.authors) > 5:
             authors_str += f" et al. ({len(paper.authors)} authors)"
 
-        journal_weight = self.config.get_journal_weight(paper.journal)
+        journal_weight = self._journal_weight(paper.journal)
         journal_note = ""
         if journal_weight > 1.0:
             journal_note = " (high-impact journal)"
         elif journal_weight < 1.0:
             journal_note = " (lower-tier journal)"
 
-        watched = [
-            a for a in paper.authors
-            if any(wa.lower() in a.lower() for wa in self.config.watched_authors)
-        ]
+        # Config matches every watched name in one precompiled regex pass per author
+        watched = self.config.match_watched_authors(paper.authors)
         author_note = ""
         if watched:
             author_note = f"\n**Note: Paper includes watched author(s): {', '.join(watched)}**"
 
-        return f"""Evaluate this paper:
-
-**Title:** {paper.title}
+        return f"""**Title:** {paper.title}
 
 **Authors:** {authors_str}{author_note}
 
@@ -117,15 +154,57 @@ When evaluating papers:
 **Publication Date:** {paper.pub_date}
 
 **Abstract:**
-{paper.abstract or '[No abstract available]'}
+{paper.abstract or '[No abstract available]'}"""
+
+    def _build_user_prompt(self, paper: Paper) -> str:
+        """Build the user prompt for a single paper."""
+        return f"""Evaluate this paper:
+
+{self._describe_paper(paper)}
 
 Respond with a JSON object containing:
-- "summary": A 2-3 sentence summary focusing on key findings and methods (not just restating the title)
-- "relevance_score": A number from 0.0 to 1.0 indicating relevance to the researcher's interests (0.7+ = high priority, 0.4-0.7 = moderate, <0.4 = low)
-- "ranking_rationale": A brief explanation of the score (1-2 sentences)
-- "matched_projects": An array of project names this paper is relevant to (can be empty)
+{_RESULT_FIELDS}
+
+Available project names: {self._project_names}"""
+
+    def _build_batch_prompt(self, papers: list[Paper]) -> str:
+        """Build the user prompt for ranking several papers in one request."""
+        blocks = "\n\n---\n\n".join(
+            f"**Paper index:** {index}\n\n{self._describe_paper(paper)}"
+            for index, paper in enumerate(papers)
+        )
+
+        return f"""Evaluate these {len(papers)} papers:
 
-Available project names: {[p.name for p in self.config.active_projects]}"""
+{blocks}
+
+Respond with a JSON array containing one object per paper, each with:
+- "index": The paper index given above
+{_RESULT_FIELDS}
+
+Available project names: {self._project_names}"""
+
+    def _request_params(self, paper: Paper) -> dict:
+        """Build the messages.create arguments for ranking a single paper."""
+        return {
+            "model": self.model,
+            "max_tokens": 1024,
+            "system": self._system,
+            "messages": [
+                {"role": "user", "content": self._build_user_prompt(paper)}
+            ],
+        }
+
+    def _batch_request_params(self, papers: list[Paper]) -> dict:
+        """Build the messages.create arguments for ranking a batch of papers."""
+        return {
+            "model": self.model,
+            "max_tokens": 1024 * len(papers),
+            "system": self._system,
+            "messages": [
+                {"role": "user", "content": self._build_batch_prompt(papers)}
+            ],
+        }
 
     def rank_paper(self, paper: Paper) -> RankingResult:
         """
@@ -137,25 +216,31 @@ Available project names: {[p.name for p in self.config.active_projects]}"""
         Returns:
             RankingResult with summary, score, rationale, and matched projects.
         """
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=1024,
-            system=self._build_system_prompt(),
-            messages=[
-                {"role": "user", "content": self._build_user_prompt(paper)}
-            ],
-        )
+        response = self.client.messages.create(**self._request_params(paper))
+        return self._parse_response(paper, response)
 
-        # Parse the JSON response
-        content = response.content[0].text.strip()
+    @staticmethod
+    def _strip_code_fence(content: str) -> str:
+        """Remove a markdown code fence wrapped around a response, if any."""
+        content = content.strip()
 
-        # Handle potential markdown code blocks
+        # Handle potential markdown code blocks: slice from after the opening
+        # fence line (e.g. ```json) up to the closing fence
         if content.startswith("```"):
-            content = content.split("```")[1]
-            if content.startswith("json"):
+            newline = content.find("\n")
+            start = newline + 1 if newline != -1 else 3
+            end = content.rfind("```", start)
+            content = content[start:end if end != -1 else None]
+            if newline == -1 and content.startswith("json"):
                 content = content[4:]
             content = content.strip()
 
+        return content
+
+    def _parse_response(self, paper: Paper, response) -> RankingResult:
+        """Turn a ranking response into a RankingResult."""
+        content = self._strip_code_fence(response.content[0].text)
+
         try:
             data = json.loads(content)
         except json.JSONDecodeError as e:
@@ -169,9 +254,54 @@ Available project names: {[p.name for p in self.config.active_projects]}"""
                 matched_projects=[],
             )
 
+        return self._result_from_data(paper, data)
+
+    def _parse_batch_text(self, content: str) -> list[dict]:
+        """Parse a complete batch ranking response into its array elements."""
+        content = self._strip_code_fence(content)
+
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            print(f"  Warning: Failed to parse batch ranking response: {e}")
+            print(f"  Response was: {content[:200]}...")
+            return []
+
+        if not isinstance(data, list):
+            print("  Warning: Batch ranking response was not a JSON array")
+            return []
+
+        return data
+
+    def _add_batch_item(
+        self,
+        papers: list[Paper],
+        item: dict,
+        ranked: dict[int, RankingResult],
+        report: Callable[[Paper, RankingResult, bool], None],
+    ):
+        """
+        Record one element of a batch response and report it.
+
+        Elements with a missing, out-of-range or repeated index are skipped,
+        leaving those papers for the caller to rank individually.
+        """
+        try:
+            index = int(item["index"])
+            if not 0 <= index < len(papers) or index in ranked:
+                return
+            result = self._result_from_data(papers[index], item)
+        except (KeyError, TypeError, ValueError):
+            return
+
+        ranked[index] = result
+        report(papers[index], result, False)
+
+    def _result_from_data(self, paper: Paper, data: dict) -> RankingResult:
+        """Build a RankingResult from parsed response fields."""
         # Apply journal weight modifier to score
         raw_score = float(data.get("relevance_score", 0.5))
-        journal_weight = self.config.get_journal_weight(paper.journal)
+        journal_weight = self._journal_weight(paper.journal)
         # Adjust score but keep it in 0-1 range
         adjusted_score = min(1.0, raw_score * journal_weight)
 
@@ -190,6 +320,9 @@ Available project names: {[p.name for p in self.config.active_projects]}"""
         """
         Rank multiple papers.
 
+        Up to max_concurrency requests run at once. The callback fires as each
+        paper finishes, so index counts completed papers rather than input order.
+
         Args:
             papers: List of papers to rank.
             callback: Optional callback(paper, result, index, total) for progress updates.
@@ -197,49 +330,146 @@ Available project names: {[p.name for p in self.config.active_projects]}"""
         Returns:
             List of (paper, result) tuples sorted by relevance score descending.
         """
-        results = []
-
-        for i, paper in enumerate(papers):
-            try:
-                result = self.rank_paper(paper)
-                results.append((paper, result))
-
-                if callback:
-                    callback(paper, result, i, len(papers))
-
-            except Exception as e:
-                print(f"  Error ranking paper {paper.id}: {e}")
-                # Add with default low score
-                results.append((paper, RankingResult(
-                    summary="[Error during ranking]",
-                    relevance_score=0.0,
-                    ranking_rationale=f"Error: {str(e)}",
-                    matched_projects=[],
-                )))
-
-        # Sort by relevance score descending
-        results.sort(key=lambda x: x[1].relevance_score, reverse=True)
-
-        return results
+        return self._rank_all(papers, callback, batch_size=1)
 
     def rank_papers_batch(
         self,
         papers: list[Paper],
         batch_size: int = 5,
+        callback: Optional[callable] = None,
     ) -> list[tuple[Paper, RankingResult]]:
         """
         Rank multiple papers in batches (more efficient for many papers).
 
+        Each API call evaluates batch_size papers, so the system prompt and
+        per-request overhead are shared across the batch. Papers missing from
+        a batch response are ranked individually.
+
         Args:
             papers: List of papers to rank.
             batch_size: Number of papers per API call.
+            callback: Optional callback(paper, result, index, total) for progress updates.
 
         Returns:
             List of (paper, result) tuples sorted by relevance score descending.
         """
-        # For now, just call rank_papers - batch processing could be added later
-        # using a single prompt with multiple papers
-        return self.rank_papers(papers)
+        return self._rank_all(papers, callback, batch_size=max(1, batch_size))
+
+    def _rank_all(
+        self,
+        papers: list[Paper],
+        callback: Optional[callable],
+        batch_size: int,
+    ) -> list[tuple[Paper, RankingResult]]:
+        """Run the async ranking loop and sort the results."""
+        if not papers:
+            return []
+
+        results = asyncio.run(self._rank_papers_async(papers, callback, batch_size))
+
+        # Sort by relevance score descending
+        results.sort(key=lambda x: x[1].relevance_score, reverse=True)
+
+        return results
+
+    async def _rank_papers_async(
+        self,
+        papers: list[Paper],
+        callback: Optional[callable],
+        batch_size: int,
+    ) -> list[tuple[Paper, RankingResult]]:
+        """Rank papers concurrently, reporting progress as each one completes."""
+        sem = asyncio.Semaphore(self.max_concurrency)
+        results = []
+
+        # Everything runs on one event loop thread, so tasks can report
+        # results straight into the shared list as soon as they have them
+        def report(paper: Paper, result: RankingResult, failed: bool):
+            if callback and not failed:
+                callback(paper, result, len(results), len(papers))
+            results.append((paper, result))
+
+        # The async client's connection pool is tied to this event loop, so
+        # it lives for one run and is closed before asyncio.run returns
+        async with anthropic.AsyncAnthropic(api_key=self._api_key) as client:
+            await asyncio.gather(*(
+                self._rank_batch_async(client, papers[i:i + batch_size], sem, report)
+                for i in range(0, len(papers), batch_size)
+            ))
+
+        return results
+
+    async def _rank_batch_async(
+        self,
+        client: anthropic.AsyncAnthropic,
+        batch: list[Paper],
+        sem: asyncio.Semaphore,
+        report: Callable[[Paper, RankingResult, bool], None],
+    ):
+        """
+        Rank a group of papers in one request, reporting each result.
+
+        The response is streamed and each paper is reported as soon as its
+        object in the JSON array is complete, rather than when the whole
+        batch finishes.
+        """
+        if len(batch) == 1:
+            report(*await self._rank_paper_async(client, batch[0], sem))
+            return
+
+        ranked = {}  # Paper index -> result, filled in as the response streams
+        try:
+            async with sem:
+                chunks = []
+                parser = IncrementalJsonArrayParser()
+                async with client.messages.stream(**self._batch_request_params(batch)) as stream:
+                    async for text in stream.text_stream:
+                        chunks.append(text)
+                        for item in parser.feed(text):
+                            self._add_batch_item(batch, item, ranked, report)
+
+            # Fall back to parsing the full response if no array elements came through
+            if not ranked:
+                for item in self._parse_batch_text("".join(chunks)):
+                    self._add_batch_item(batch, item, ranked, report)
+
+        except Exception as e:
+            print(f"  Error ranking batch of {len(batch)} papers: {e}")
+
+        # Fall back to one request per paper for anything the batch missed
+        # (the semaphore is released above, so these can acquire it)
+        missing = [paper for i, paper in enumerate(batch) if i not in ranked]
+        for task in asyncio.as_completed(
+            [self._rank_paper_async(client, paper, sem) for paper in missing]
+        ):
+            report(*await task)
+
+    async def _rank_paper_async(
+        self,
+        client: anthropic.AsyncAnthropic,
+        paper: Paper,
+        sem: asyncio.Semaphore,
+    ) -> tuple[Paper, RankingResult, bool]:
+        """
+        Rank a single paper with the async client.
+
+        Returns:
+            Tuple of (paper, result, whether ranking failed).
+        """
+        try:
+            async with sem:
+                response = await client.messages.create(**self._request_params(paper))
+            return paper, self._parse_response(paper, response), False
+
+        except Exception as e:
+            print(f"  Error ranking paper {paper.id}: {e}")
+            # Add with default low score
+            return paper, RankingResult(
+                summary="[Error during ranking]",
+                relevance_score=0.0,
+                ranking_rationale=f"Error: {str(e)}",
+                matched_projects=[],
+            ), True
 
 
 def rank_and_update_db(
@@ -268,7 +498,7 @@ def rank_and_update_db(
 
     def progress_callback(paper, result, index, total):
         if verbose:
-            score_bar = "█" * int(result.relevance_score * 10) + "░" * (10 - int(result.relevance_score * 10))
+            score_bar = _SCORE_BARS[max(0, min(10, int(result.relevance_score * 10)))]
             print(f"  [{index+1}/{total}] {score_bar} {result.relevance_score:.2f} - {paper.title[:50]}...")
 
     if verbose:
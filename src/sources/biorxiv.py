@@ -8,14 +8,52 @@ recent papers and filter locally based on keywords.
 """
 
 import re
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
 import requests
 
-from .pubmed import Paper
+from .. import fastjson
+from .httpcache import create_session
+from .pubmed import Paper, format_author_name
+from .ratelimit import RateLimiter
+
+# Listing pages requested concurrently once the first page reports the total.
+# The rate limiter still caps the request rate; this overlaps their latency.
+PAGE_WORKERS = 4
+
+# Quoted phrases in a search query
+_PHRASE_RE = re.compile(r'"([^"]+)"')
+
+
+def _format_author(author: str) -> str:
+    """Convert a bioRxiv "Last, First" author to "Last F" format."""
+    last, sep, rest = author.partition(",")
+    if not sep:
+        return author
+    return format_author_name(last.strip(), rest.partition(",")[0].strip())
+
+
+def _unique_by_doi(entries: list[dict], seen: set[str]) -> list[dict]:
+    """
+    Drop entries whose DOI is already in `seen`, adding the new DOIs to it.
+
+    Listings repeat a DOI for each preprint version, and a preprint can be
+    cross-posted to both servers; the first occurrence is kept. Entries
+    without a DOI are always kept.
+    """
+    unique = []
+    for entry in entries:
+        doi = entry.get("doi")
+        if doi:
+            if doi in seen:
+                continue
+            seen.add(doi)
+        unique.append(entry)
+    return unique
 
 
 class BioRxivClient:
@@ -31,16 +69,16 @@ class BioRxivClient:
             include_medrxiv: Whether to also search medRxiv (default True).
         """
         self.include_medrxiv = include_medrxiv
-        self.session = requests.Session()
-        self._last_request_time = 0
-        self._min_interval = 0.5  # Be conservative with rate limiting
+        self.session = create_session()
+        self._rate_limiter = RateLimiter(rate=2)  # Be conservative with rate limiting
 
-    def _rate_limit(self):
-        """Enforce rate limiting between requests."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_interval:
-            time.sleep(self._min_interval - elapsed)
-        self._last_request_time = time.time()
+        # bioRxiv has no search endpoint, so every query filters the same
+        # date-range listing. Cache it per (server, start, end) so the
+        # listing is downloaded once per run instead of once per query.
+        self._listing_cache: dict[tuple[str, str, str], tuple[int, list[dict]]] = {}
+        # One lock per listing, so bioRxiv and medRxiv can download at once
+        self._listing_locks: dict[tuple[str, str, str], threading.Lock] = {}
+        self._listing_lock = threading.Lock()
 
     def _fetch_papers_from_server(
         self,
@@ -61,96 +99,139 @@ class BioRxivClient:
         Returns:
             List of paper dictionaries from the API.
         """
-        all_papers = []
-        cursor = 0
-        page_size = 100  # API returns up to 100 per page
+        key = (server, start_date, end_date)
+        with self._listing_lock:
+            lock = self._listing_locks.setdefault(key, threading.Lock())
+
+        # Hold the listing's lock while fetching so concurrent queries wait
+        # for the first download instead of repeating it
+        with lock:
+            cached = self._listing_cache.get(key)
+            if cached and cached[0] >= max_results:
+                return cached[1][:max_results]
+
+            all_papers, complete = self._fetch_listing(server, start_date, end_date, max_results)
+            if complete:
+                self._listing_cache[key] = (max_results, all_papers)
+            return all_papers
+
+    def _fetch_listing(
+        self,
+        server: str,
+        start_date: str,
+        end_date: str,
+        max_results: int,
+    ) -> tuple[list[dict], bool]:
+        """
+        Page through the details endpoint for a date range.
 
-        while len(all_papers) < max_results:
-            self._rate_limit()
+        The first page reports the total, after which the remaining pages are
+        requested concurrently and reassembled in cursor order.
 
-            url = f"{self.BASE_URL}/details/{server}/{start_date}/{end_date}/{cursor}"
+        Returns:
+            Tuple of (paper dictionaries, whether the fetch finished without errors).
+        """
+        page_size = 100  # API returns up to 100 per page
 
-            try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                data = response.json()
-            except requests.RequestException as e:
-                print(f"    Error fetching from {server}: {e}")
-                break
+        data = self._fetch_page(server, start_date, end_date, 0)
+        if data is None:
+            return [], False
+
+        all_papers = data.get("collection", [])
+        # A short first page is the whole listing, whatever the total says
+        if len(all_papers) < page_size:
+            return all_papers[:max_results], True
 
-            papers = data.get("collection", [])
-            if not papers:
+        # Check if there are more pages
+        total = 0
+        for msg in data.get("messages", []):
+            if "total" in msg:
+                total = int(msg.get("total", 0))
                 break
 
-            all_papers.extend(papers)
+        cursors = range(page_size, min(total, max_results), page_size)
+        if not cursors:
+            return all_papers[:max_results], True
 
-            # Check if there are more pages
-            messages = data.get("messages", [])
-            total = 0
-            for msg in messages:
-                if "total" in msg:
-                    total = int(msg.get("total", 0))
+        executor = ThreadPoolExecutor(max_workers=PAGE_WORKERS)
+        try:
+            pages = executor.map(
+                lambda cursor: self._fetch_page(server, start_date, end_date, cursor),
+                cursors,
+            )
+            for page in pages:
+                if page is None:
+                    return all_papers[:max_results], False
+                papers = page.get("collection", [])
+                all_papers.extend(papers)
+                # A short page is the last one; don't wait on pages past it
+                if len(papers) < page_size:
                     break
+        finally:
+            executor.shutdown(cancel_futures=True)
 
-            cursor += page_size
-            if cursor >= total:
-                break
-
-        return all_papers[:max_results]
+        return all_papers[:max_results], True
 
-    def _matches_query(self, paper: dict, query: str) -> bool:
-        """
-        Check if a paper matches a search query.
-
-        Uses simple keyword matching on title and abstract.
-        """
+    def _fetch_page(
+        self,
+        server: str,
+        start_date: str,
+        end_date: str,
+        cursor: int,
+    ) -> Optional[dict]:
+        """Fetch one page of the details endpoint, or None on error."""
+        self._rate_limiter.acquire()
+
+        url = f"{self.BASE_URL}/details/{server}/{start_date}/{end_date}/{cursor}"
+
+        try:
+            response = self.session.get(url, timeout=30)
+            response.raise_for_status()
+            return fastjson.loads(response.content)
+        except (requests.RequestException, ValueError) as e:
+            print(f"    Error fetching from {server}: {e}")
+            return None
+
+    @staticmethod
+    def _parse_query(query: str) -> tuple[list[str], list[str]]:
+        """Split a query into lowercased quoted phrases and remaining terms."""
         # Normalize query - split into terms
         query_lower = query.lower()
 
         # Handle quoted phrases
-        phrases = re.findall(r'"([^"]+)"', query_lower)
+        phrases = _PHRASE_RE.findall(query_lower)
         # Remove quoted phrases and get remaining terms
-        remaining = re.sub(r'"[^"]+"', '', query_lower)
-        terms = [t.strip() for t in remaining.split() if t.strip()]
+        remaining = _PHRASE_RE.sub('', query_lower)
+        terms = remaining.split()
 
-        # Combine title and abstract for searching
-        title = (paper.get("title") or "").lower()
-        abstract = (paper.get("abstract") or "").lower()
-        text = f"{title} {abstract}"
+        return phrases, terms
 
-        # Check phrases (must match exactly)
-        for phrase in phrases:
-            if phrase not in text:
-                return False
+    def _matches_query(self, paper: dict, query: str) -> bool:
+        """
+        Check if a paper matches a search query.
+
+        Uses simple keyword matching on title and abstract.
+        """
+        return self._matches_parsed(paper, *self._parse_query(query))
 
-        # Check individual terms (all must be present)
-        for term in terms:
-            if term not in text:
-                return False
+    @staticmethod
+    def _matches_parsed(paper: dict, phrases: list[str], terms: list[str]) -> bool:
+        """Check a paper against a query already split by _parse_query."""
+        # Combine title and abstract for searching. Listings are cached and
+        # filtered once per query, so keep the lowercased text on the entry.
+        text = paper.get("_search_text")
+        if text is None:
+            text = f"{paper.get('title') or ''} {paper.get('abstract') or ''}".lower()
+            paper["_search_text"] = text
 
-        return True
+        # Phrases must match exactly and individual terms must all be present
+        return all(phrase in text for phrase in phrases) and all(term in text for term in terms)
 
     def _convert_to_paper(self, data: dict, server: str) -> Paper:
         """Convert bioRxiv API response to Paper object."""
-        # Parse authors
-        authors_str = data.get("authors", "")
-        if authors_str:
-            # bioRxiv format: "Last, First; Last, First; ..."
-            authors = []
-            for author in authors_str.split(";"):
-                author = author.strip()
-                if author:
-                    # Convert "Last, First" to "Last F" format
-                    parts = author.split(",")
-                    if len(parts) >= 2:
-                        last = parts[0].strip()
-                        first = parts[1].strip()
-                        initials = "".join(n[0] for n in first.split() if n)
-                        authors.append(f"{last} {initials}")
-                    else:
-                        authors.append(author)
-        else:
-            authors = []
+        # Parse authors (bioRxiv format: "Last, First; Last, First; ...")
+        authors_str = data.get("authors") or ""
+        authors = [_format_author(a) for a in map(str.strip, authors_str.split(";")) if a]
 
         # Get DOI
         doi = data.get("doi", "")
@@ -198,25 +279,33 @@ class BioRxivClient:
         end_str = end_date.strftime("%Y-%m-%d")
 
         all_papers = []
+        seen_dois: set[str] = set()
 
-        # Fetch from bioRxiv
+        # Download both listings at once; each server has its own cache lock
         print(f"    Fetching from bioRxiv ({start_str} to {end_str})...")
-        biorxiv_data = self._fetch_papers_from_server(
-            "biorxiv", start_str, end_str, max_results
-        )
-        for data in biorxiv_data:
-            all_papers.append(self._convert_to_paper(data, "biorxiv"))
-        print(f"    Found {len(biorxiv_data)} papers from bioRxiv")
-
-        # Fetch from medRxiv if enabled
         if self.include_medrxiv:
             print(f"    Fetching from medRxiv ({start_str} to {end_str})...")
-            medrxiv_data = self._fetch_papers_from_server(
-                "medrxiv", start_str, end_str, max_results
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            biorxiv_future = executor.submit(
+                self._fetch_papers_from_server, "biorxiv", start_str, end_str, max_results
             )
-            for data in medrxiv_data:
-                all_papers.append(self._convert_to_paper(data, "medrxiv"))
-            print(f"    Found {len(medrxiv_data)} papers from medRxiv")
+            medrxiv_future = None
+            if self.include_medrxiv:
+                medrxiv_future = executor.submit(
+                    self._fetch_papers_from_server, "medrxiv", start_str, end_str, max_results
+                )
+
+            biorxiv_data = _unique_by_doi(biorxiv_future.result(), seen_dois)
+            all_papers.extend([self._convert_to_paper(data, "biorxiv") for data in biorxiv_data])
+            print(f"    Found {len(biorxiv_data)} papers from bioRxiv")
+
+            if medrxiv_future is not None:
+                medrxiv_data = _unique_by_doi(medrxiv_future.result(), seen_dois)
+                all_papers.extend(
+                    [self._convert_to_paper(data, "medrxiv") for data in medrxiv_data]
+                )
+                print(f"    Found {len(medrxiv_data)} papers from medRxiv")
 
         return all_papers
 
@@ -244,24 +333,29 @@ class BioRxivClient:
         end_str = end_date.strftime("%Y-%m-%d")
 
         matching_papers = []
+        seen_dois: set[str] = set()
+        # The query is the same for every paper, so parse it once
+        phrases, terms = self._parse_query(query)
 
         # Search bioRxiv
-        biorxiv_data = self._fetch_papers_from_server(
-            "biorxiv", start_str, end_str, max_results=1000
+        biorxiv_data = _unique_by_doi(
+            self._fetch_papers_from_server("biorxiv", start_str, end_str, max_results=1000),
+            seen_dois,
         )
         for data in biorxiv_data:
-            if self._matches_query(data, query):
+            if self._matches_parsed(data, phrases, terms):
                 matching_papers.append(self._convert_to_paper(data, "biorxiv"))
                 if len(matching_papers) >= max_results:
                     break
 
         # Search medRxiv if enabled and need more results
         if self.include_medrxiv and len(matching_papers) < max_results:
-            medrxiv_data = self._fetch_papers_from_server(
-                "medrxiv", start_str, end_str, max_results=1000
+            medrxiv_data = _unique_by_doi(
+                self._fetch_papers_from_server("medrxiv", start_str, end_str, max_results=1000),
+                seen_dois,
             )
             for data in medrxiv_data:
-                if self._matches_query(data, query):
+                if self._matches_parsed(data, phrases, terms):
                     matching_papers.append(self._convert_to_paper(data, "medrxiv"))
                     if len(matching_papers) >= max_results:
                         break
@@ -0,0 +1,43 @@
+"""
+HTTP sessions for the source clients, cached on disk when requests-cache is installed.
+
+Repeat runs within the cache window (e.g. a --search-only run followed by a
+full run) reuse the stored bioRxiv listings and PubMed responses instead of
+downloading them again. Without requests-cache this is a plain Session.
+"""
+
+from pathlib import Path
+
+import requests
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# SQLite file shared by all clients (requests-cache appends ".sqlite")
+HTTP_CACHE_PATH = Path(__file__).parent.parent.parent / "data" / "http_cache"
+
+# Seconds a cached response stays fresh unless the server's headers say otherwise
+HTTP_CACHE_EXPIRE = 3600
+
+
+def create_session() -> requests.Session:
+    """
+    Create a session for API requests.
+
+    Returns:
+        A requests_cache.CachedSession backed by SQLite when requests-cache is
+        available, otherwise a plain requests.Session.
+    """
+    if requests_cache is None:
+        return requests.Session()
+
+    HTTP_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    return requests_cache.CachedSession(
+        cache_name=str(HTTP_CACHE_PATH),
+        backend="sqlite",
+        expire_after=HTTP_CACHE_EXPIRE,
+        cache_control=True,  # Honor Cache-Control/ETag/Last-Modified when sent
+        allowable_codes=(200,),  # Never cache errors or 429s
+    )
@@ -4,17 +4,30 @@ PubMed E-utilities client for searching and fetching paper metadata.
 NCBI E-utilities documentation: https://www.ncbi.nlm.nih.gov/books/NBK25500/
 """
 
+import io
 import json
 import os
-import time
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Union
 from urllib.parse import quote_plus
 
 import requests
 
+from .. import fastjson
+from .httpcache import create_session
+from .ratelimit import RateLimiter, parse_retry_after
+
+# PubDate months given as abbreviated names
+_MONTH_MAP = {
+    "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
+    "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
+    "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12",
+}
+
 
 @dataclass
 class Paper:
@@ -37,6 +50,11 @@ class Paper:
     ranking_rationale: Optional[str] = None
     matched_projects: list[str] = field(default_factory=list)
 
+    @cached_property
+    def text_lower(self) -> str:
+        """Lowercased title + abstract, computed once for keyword matching."""
+        return f"{self.title} {self.abstract}".lower()
+
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -58,6 +76,17 @@ class Paper:
         }
 
 
+@lru_cache(maxsize=8192)
+def format_author_name(last: str, first: str) -> str:
+    """
+    Format an author as "Last FM" from their last name and given names.
+
+    Cached because the same authors (often a lab's PI) recur across papers.
+    """
+    initials = "".join([name[0] for name in first.split()]) if first else ""
+    return f"{last} {initials}".strip()
+
+
 class PubMedClient:
     """Client for searching PubMed using NCBI E-utilities."""
 
@@ -75,39 +104,41 @@ class PubMedClient:
         """
         self.api_key = api_key or os.getenv("NCBI_API_KEY")
         self.email = email or os.getenv("NCBI_EMAIL")
-        self.session = requests.Session()
-
-        # Rate limiting: 3 requests/sec without API key, 10/sec with key
-        # Being conservative to avoid 429s
-        self._last_request_time = 0
-        self._min_interval = 0.15 if self.api_key else 0.5
+        self.session = create_session()
 
-    def _rate_limit(self):
-        """Enforce rate limiting between requests."""
-        elapsed = time.time() - self._last_request_time
-        if elapsed < self._min_interval:
-            time.sleep(self._min_interval - elapsed)
-        self._last_request_time = time.time()
+        # Rate limiting: NCBI allows 3 requests/sec without an API key, 10/sec with one
+        self._rate_limiter = RateLimiter(rate=10 if self.api_key else 3)
 
     def _request_with_retry(
         self, url: str, params: dict, max_retries: int = 3
     ) -> requests.Response:
-        """Make a request with exponential backoff retry on 429 errors."""
+        """
+        Make a rate-limited request, backing off on 429 errors.
+
+        Honors NCBI's Retry-After header when present (falling back to
+        exponential backoff) and pauses briefly when X-RateLimit-Remaining
+        reports the quota is exhausted.
+        """
         for attempt in range(max_retries):
-            self._rate_limit()
+            self._rate_limiter.acquire()
             response = self.session.get(url, params=params)
 
             if response.status_code == 429:
-                wait_time = (2 ** attempt) + 1  # 2, 3, 5 seconds
-                print(f"    Rate limited, waiting {wait_time}s...")
-                time.sleep(wait_time)
+                wait_time = parse_retry_after(response.headers.get("Retry-After"))
+                if wait_time is None:
+                    wait_time = (2 ** attempt) + 1  # 2, 3, 5 seconds
+                print(f"    Rate limited, waiting {wait_time:g}s...")
+                self._rate_limiter.pause(wait_time)
                 continue
 
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                self._rate_limiter.pause(1.0)
+
             response.raise_for_status()
             return response
 
         # Final attempt
-        self._rate_limit()
+        self._rate_limiter.acquire()
         response = self.session.get(url, params=params)
         response.raise_for_status()
         return response
@@ -156,7 +187,7 @@ class PubMedClient:
 
         response = self._request_with_retry(f"{self.BASE_URL}/esearch.fcgi", params)
 
-        data = response.json()
+        data = fastjson.loads(response.content)
         result = data.get("esearchresult", {})
 
         if "ERROR" in result:
@@ -178,7 +209,8 @@ class PubMedClient:
             pmids: List of PubMed IDs to fetch.
 
         Returns:
-            List of Paper objects with full metadata.
+            List of Paper objects with full metadata. A batch that still fails
+            after retries is logged and skipped, so the rest are returned.
         """
         if not pmids:
             return []
@@ -186,14 +218,29 @@ class PubMedClient:
         # Fetch in batches of 200 (NCBI limit)
         all_papers = []
         batch_size = 200
+        batches = [pmids[i : i + batch_size] for i in range(0, len(pmids), batch_size)]
+
+        if len(batches) == 1:
+            return self._fetch_batch_or_skip(batches[0])
 
-        for i in range(0, len(pmids), batch_size):
-            batch = pmids[i : i + batch_size]
-            papers = self._fetch_batch(batch)
-            all_papers.extend(papers)
+        # Batches are independent round-trips, so overlap them. The shared
+        # rate limiter keeps the combined request rate within NCBI's limit;
+        # map() returns batches in PMID order.
+        max_workers = min(len(batches), 8 if self.api_key else 2)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for papers in executor.map(self._fetch_batch_or_skip, batches):
+                all_papers.extend(papers)
 
         return all_papers
 
+    def _fetch_batch_or_skip(self, pmids: list[str]) -> list[Paper]:
+        """Fetch a batch of PMIDs, logging and returning [] if it fails."""
+        try:
+            return self._fetch_batch(pmids)
+        except (requests.RequestException, ET.ParseError) as e:
+            print(f"    Error fetching PubMed batch of {len(pmids)} papers: {e}")
+            return []
+
     def _fetch_batch(self, pmids: list[str]) -> list[Paper]:
         """Fetch metadata for a batch of PMIDs."""
         params = self._build_params(
@@ -204,26 +251,35 @@ class PubMedClient:
         )
 
         response = self._request_with_retry(f"{self.BASE_URL}/efetch.fcgi", params)
-        return self._parse_xml(response.text)
+        # Parse the raw bytes; the XML declares its own encoding
+        return self._parse_xml(response.content)
+
+    def _parse_xml(self, xml_data: Union[bytes, str]) -> list[Paper]:
+        """
+        Parse PubMed XML response into Paper objects.
 
-    def _parse_xml(self, xml_text: str) -> list[Paper]:
-        """Parse PubMed XML response into Paper objects."""
+        Articles are parsed as they stream out of the parser and cleared
+        afterwards, so only one article's element tree is held at a time
+        rather than the whole batch.
+        """
         papers = []
+        if isinstance(xml_data, str):
+            xml_data = xml_data.encode()
 
         try:
-            root = ET.fromstring(xml_text)
+            for _, article in ET.iterparse(io.BytesIO(xml_data)):
+                if article.tag != "PubmedArticle":
+                    continue
+                try:
+                    paper = self._parse_article(article)
+                    if paper:
+                        papers.append(paper)
+                except Exception as e:
+                    pmid = article.findtext(".//PMID", "unknown")
+                    print(f"Error parsing PMID {pmid}: {e}")
+                article.clear()
         except ET.ParseError as e:
             print(f"XML parse error: {e}")
-            return papers
-
-        for article in root.findall(".//PubmedArticle"):
-            try:
-                paper = self._parse_article(article)
-                if paper:
-                    papers.append(paper)
-            except Exception as e:
-                pmid = article.findtext(".//PMID", "unknown")
-                print(f"Error parsing PMID {pmid}: {e}")
 
         return papers
 
@@ -279,22 +335,21 @@ class PubMedClient:
                     abstract_parts.append(content)
             abstract = " ".join(abstract_parts)
 
-        # DOI
+        # DOI and PMC ID (PMC means free full text), in one pass over the
+        # article's own ID list. A direct path skips the recursive search
+        # through MeSH terms and reference lists (whose entries carry
+        # ArticleIdLists of their own).
         doi = None
-        article_id_list = article.find(".//ArticleIdList")
-        if article_id_list is not None:
-            for aid in article_id_list.findall("ArticleId"):
-                if aid.get("IdType") == "doi":
-                    doi = aid.text
-                    break
-
-        # Check for PMC (free full text)
         pmc_id = None
-        if article_id_list is not None:
-            for aid in article_id_list.findall("ArticleId"):
-                if aid.get("IdType") == "pmc":
-                    pmc_id = aid.text
-                    break
+        for aid in article.iterfind("PubmedData/ArticleIdList/ArticleId"):
+            id_type = aid.get("IdType")
+            if id_type == "doi" and doi is None:
+                doi = aid.text
+            elif id_type == "pmc" and pmc_id is None:
+                pmc_id = aid.text
+            # Both found; the remaining IDs (pii, mid, ...) aren't needed
+            if doi is not None and pmc_id is not None:
+                break
 
         is_open_access = pmc_id is not None
         full_text_url = None
@@ -318,7 +373,7 @@ class PubMedClient:
     def _extract_pub_date(self, article: ET.Element) -> str:
         """Extract publication date from article element."""
         # Try ArticleDate first (electronic publication)
-        article_date = article.find(".//ArticleDate")
+        article_date = article.find("ArticleDate")
         if article_date is not None:
             year = article_date.findtext("Year", "")
             month = article_date.findtext("Month", "01")
@@ -327,20 +382,14 @@ class PubMedClient:
                 return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
 
         # Fall back to Journal PubDate
-        pub_date = article.find(".//Journal/JournalIssue/PubDate")
+        pub_date = article.find("Journal/JournalIssue/PubDate")
         if pub_date is not None:
             year = pub_date.findtext("Year", "")
             month = pub_date.findtext("Month", "01")
             day = pub_date.findtext("Day", "01")
 
             # Month might be text like "Jan"
-            month_map = {
-                "Jan": "01", "Feb": "02", "Mar": "03", "Apr": "04",
-                "May": "05", "Jun": "06", "Jul": "07", "Aug": "08",
-                "Sep": "09", "Oct": "10", "Nov": "11", "Dec": "12",
-            }
-            if month in month_map:
-                month = month_map[month]
+            month = _MONTH_MAP.get(month, month)
 
             if year:
                 return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
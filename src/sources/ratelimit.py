@@ -0,0 +1,60 @@
+"""
+Thread-safe token-bucket rate limiter shared by the API clients.
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second, bursting up to `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate: Sustained requests per second.
+            burst: Maximum number of requests that may be made back-to-back.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made, then consume a token."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                time.sleep(self._paused_until - now)
+                now = time.monotonic()
+
+            self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            if self._tokens < 1:
+                time.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._last_refill = time.monotonic()
+
+            self._tokens -= 1
+
+    def pause(self, seconds: float):
+        """Hold off all callers for `seconds` (e.g. after a 429 response)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds, or None if absent/unparseable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
@@ -6,13 +6,15 @@ and inserting them as seed papers (auto-starred).
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 import requests
 
+from . import fastjson
 from .database import PaperDatabase
-from .sources.pubmed import Paper
+from .sources.pubmed import Paper, format_author_name
 
 
 ZOTERO_API_BASE = "https://api.zotero.org"
@@ -57,55 +59,74 @@ def sync_zotero_library(
     if tag_filter:
         params["tag"] = tag_filter
 
+    # `since` limits results to items modified after the last sync, and the
+    # conditional header gets a bodiless 304 when nothing changed at all
+    first_headers = {}
     if last_version:
         params["since"] = str(last_version)
+        first_headers["If-Modified-Since-Version"] = str(last_version)
 
     new_count = 0
-    start = 0
+    # Paper ids already stored this sync (a DOI can appear on several items)
+    seen_ids: set[str] = set()
     new_version = last_version
 
-    while True:
-        params["start"] = start
-
-        response = requests.get(
-            f"{ZOTERO_API_BASE}/users/{user_id}/items",
-            headers=headers,
-            params=params,
-            timeout=30,
+    # One session for the whole sync, so every page reuses the same
+    # keep-alive connection instead of a new TCP + TLS handshake. Pages are
+    # fetched on a worker thread, so the next page downloads while the
+    # current one is written to the database.
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=1) as executor:
+        session.headers.update(headers)
+
+        def fetch_page(
+            url: str,
+            page_params: Optional[dict] = None,
+            page_headers: Optional[dict] = None,
+        ) -> requests.Response:
+            return session.get(url, params=page_params, headers=page_headers, timeout=30)
+
+        next_page = executor.submit(
+            fetch_page, f"{ZOTERO_API_BASE}/users/{user_id}/items", params, first_headers
         )
-
-        if response.status_code == 304:
-            # No changes since last sync
-            break
-
-        if response.status_code != 200:
-            print(f"Zotero API error: {response.status_code} - {response.text[:200]}")
-            break
-
-        # Track the library version from response headers
-        lib_version = response.headers.get("Last-Modified-Version")
-        if lib_version:
-            lib_version = int(lib_version)
-            if new_version is None or lib_version > new_version:
-                new_version = lib_version
-
-        items = response.json()
-        if not items:
-            break
-
-        for item in items:
-            paper = _zotero_item_to_paper(item)
-            if paper:
-                is_new = db.insert_seed_paper(paper, source="zotero_sync")
-                if is_new:
-                    new_count += 1
-                    print(f"  Synced: {paper.title[:60]}...")
-
-        # Check for more pages
-        total = int(response.headers.get("Total-Results", 0))
-        start += len(items)
-        if start >= total:
-            break
+        while next_page is not None:
+            response = next_page.result()
+            next_page = None
+
+            if response.status_code == 304:
+                # No changes since last sync
+                break
+
+            if response.status_code != 200:
+                print(f"Zotero API error: {response.status_code} - {response.text[:200]}")
+                break
+
+            # Track the library version from response headers
+            lib_version = response.headers.get("Last-Modified-Version")
+            if lib_version:
+                lib_version = int(lib_version)
+                if new_version is None or lib_version > new_version:
+                    new_version = lib_version
+
+            items = fastjson.loads(response.content)
+            if not items:
+                break
+
+            # Follow the Link header to the next page (its URL carries the
+            # query), and start fetching it while this one is stored
+            next_url = response.links.get("next", {}).get("url")
+            if next_url:
+                next_page = executor.submit(fetch_page, next_url)
+
+            # Store the whole page of seeds in one transaction, skipping
+            # duplicates so each paper is inserted and counted once
+            papers = []
+            for paper in map(_zotero_item_to_paper, items):
+                if paper and paper.id not in seen_ids:
+                    seen_ids.add(paper.id)
+                    papers.append(paper)
+            for paper in db.insert_seed_papers(papers, source="zotero_sync"):
+                new_count += 1
+                print(f"  Synced: {paper.title[:60]}...")
 
     # Save sync version for next incremental sync
     if new_version and new_version != last_version:
@@ -123,14 +144,11 @@ def _zotero_item_to_paper(item: dict) -> Optional[Paper]:
         return None
 
     # Extract authors
-    authors = []
-    for creator in data.get("creators", []):
-        if creator.get("creatorType") == "author":
-            last = creator.get("lastName", "")
-            first = creator.get("firstName", "")
-            if last:
-                initials = "".join(w[0] for w in first.split() if w) if first else ""
-                authors.append(f"{last} {initials}".strip())
+    authors = [
+        format_author_name(creator["lastName"], creator.get("firstName", ""))
+        for creator in data.get("creators", [])
+        if creator.get("creatorType") == "author" and creator.get("lastName")
+    ]
 
     # Extract DOI
     doi = data.get("DOI", "")
@@ -6,16 +6,29 @@ Or: flask --app web.app run
 """
 
 import os
+import socket
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
 import yaml
+from jinja2 import FileSystemBytecodeCache
 
-from src.config_loader import load_config, Config
+# Prefer libyaml's C emitter when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+from src import fastjson
+from src.config_loader import load_config, load_raw_config, cache_raw_config, Config
 from src.database import PaperDatabase
 
 WEB_DIR = Path(__file__).parent
@@ -26,25 +39,148 @@ app = Flask(
 )
 app.secret_key = os.environ.get('FLASK_SECRET_KEY', 'dev-secret-change-in-production')
 
+# Keep compiled templates in the user's temp dir so a restart doesn't
+# recompile them, and compile them all now rather than on first request.
+# (Outside debug mode Flask already skips the per-render mtime check.)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+for _template in app.jinja_env.list_templates():
+    app.jinja_env.get_template(_template)
+
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
 CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
 DATA_PATH = PROJECT_ROOT / "data" / "papers.db"
 
+# One database instance shared by all requests (PaperDatabase serializes
+# access between threads), so each request skips reopening SQLite
+_db: Optional[PaperDatabase] = None
+_db_lock = threading.Lock()
+
+# Serializes config file writes, and read-modify-write updates around them
+_config_write_lock = threading.RLock()
+
+# Request keys accepted by the section endpoints, and the config key each sets
+CONFIG_SECTIONS = {
+    'queries': 'search_queries',
+    'authors': 'watched_authors',
+    'projects': 'active_projects',
+    'journal_weights': 'journal_weights',
+    'settings': 'settings',
+}
+
+# The dashboard polls /api/stats; reuse the serialized body for this long
+STATS_CACHE_SECONDS = 2
+_stats_cache: Optional[tuple[float, bytes]] = None  # (monotonic time, body)
+_stats_lock = threading.Lock()
+
 
 def load_config_raw() -> dict:
-    """Load raw YAML config as dict."""
+    """Load raw YAML config as dict (cached until the file changes)."""
     if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            return yaml.safe_load(f) or {}
+        return load_raw_config(CONFIG_PATH)
     return {}
 
 
+def get_db() -> PaperDatabase:
+    """Return the shared database instance, opening it on first use."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = PaperDatabase(DATA_PATH)
+    return _db
+
+
+def json_response(obj):
+    """Build a JSON response, serialized with orjson when it's installed."""
+    return app.response_class(fastjson.dumps(obj), mimetype='application/json')
+
+
 def save_config_raw(config: dict):
-    """Save config dict to YAML file."""
+    """Save config dict to YAML file (atomically, so a crash can't truncate it)."""
     CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(CONFIG_PATH, 'w') as f:
-        yaml.dump(config, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    data = yaml.dump(
+        config, Dumper=SafeDumper,
+        default_flow_style=False, sort_keys=False, allow_unicode=True,
+    ).encode('utf-8')
+
+    # Write the whole file in one call to a temp file, then swap it in.
+    # The lock keeps two request threads from sharing the temp file.
+    tmp_path = CONFIG_PATH.with_suffix('.yaml.tmp')
+    with _config_write_lock:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_PATH)
+
+        # Readers get the saved dict back without re-parsing the file
+        cache_raw_config(CONFIG_PATH, config)
+
+
+def _is_str_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(v, str) for v in value)
+
+
+def _is_project_list(value) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(p, dict) and isinstance(p.get('name'), str)
+        and _is_str_list(p.get('keywords', []))
+        for p in value
+    )
+
+
+def _is_journal_tiers(value) -> bool:
+    return isinstance(value, dict) and all(
+        isinstance(tier, dict)
+        and isinstance(tier.get('weight', 1.0), (int, float))
+        and not isinstance(tier.get('weight'), bool)
+        and _is_str_list(tier.get('journals', []))
+        for tier in value.values()
+    )
+
+
+# Shape each section must have, checked before anything is written
+SECTION_VALIDATORS = {
+    'queries': (_is_str_list, 'a list of strings'),
+    'authors': (_is_str_list, 'a list of strings'),
+    'projects': (_is_project_list, 'a list of {name, keywords} objects'),
+    'journal_weights': (_is_journal_tiers, 'an object of {weight, journals} tiers'),
+    'settings': (lambda value: isinstance(value, dict), 'an object'),
+}
+
+
+def request_object() -> dict:
+    """Parse the request body as a JSON object (with orjson when it's installed)."""
+    data = fastjson.loads(request.get_data(cache=False))
+    if not isinstance(data, dict):
+        raise ValueError('expected a JSON object')
+    return data
+
+
+def update_config_sections(sections: dict):
+    """
+    Replace several config sections with one load and one save.
+
+    Args:
+        sections: Values keyed by request key (see CONFIG_SECTIONS).
+
+    Raises:
+        ValueError: If a section has the wrong shape (nothing is saved).
+    """
+    for key, value in sections.items():
+        is_valid, expected = SECTION_VALIDATORS[key]
+        if not is_valid(value):
+            raise ValueError(f"'{key}' must be {expected}")
+
+    with _config_write_lock:
+        config = load_config_raw()
+        for key, value in sections.items():
+            if key in ('queries', 'authors'):
+                # Strip each entry once and drop the empty ones
+                value = list(filter(None, map(str.strip, value)))
+            config[CONFIG_SECTIONS[key]] = value
+        save_config_raw(config)
 
 
 @app.route('/')
@@ -55,7 +191,7 @@ def index():
     # Get database stats
     stats = {}
     try:
-        db = PaperDatabase(DATA_PATH)
+        db = get_db()
         stats = db.get_stats()
     except Exception as e:
         stats = {'error': str(e)}
@@ -66,7 +202,7 @@ def index():
 @app.route('/api/config', methods=['GET'])
 def get_config():
     """Get current config as JSON."""
-    return jsonify(load_config_raw())
+    return json_response(load_config_raw())
 
 
 @app.route('/api/config', methods=['POST'])
@@ -80,15 +216,28 @@ def update_config():
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
+@app.route('/api/config/patch', methods=['POST'])
+def patch_config():
+    """Update any of the config sections in one request (one load and save)."""
+    try:
+        data = request_object()
+        sections = {key: data[key] for key in CONFIG_SECTIONS if key in data}
+        if not sections:
+            return jsonify({
+                'status': 'error',
+                'message': f"expected one of: {', '.join(CONFIG_SECTIONS)}",
+            }), 400
+        update_config_sections(sections)
+        return jsonify({'status': 'ok'})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+
 @app.route('/api/queries', methods=['POST'])
 def update_queries():
     """Update search queries."""
     try:
-        config = load_config_raw()
-        queries = request.json.get('queries', [])
-        # Filter empty strings
-        config['search_queries'] = [q.strip() for q in queries if q.strip()]
-        save_config_raw(config)
+        update_config_sections({'queries': request_object().get('queries', [])})
         return jsonify({'status': 'ok'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 400
@@ -98,10 +247,7 @@ def update_queries():
 def update_authors():
     """Update watched authors."""
     try:
-        config = load_config_raw()
-        authors = request.json.get('authors', [])
-        config['watched_authors'] = [a.strip() for a in authors if a.strip()]
-        save_config_raw(config)
+        update_config_sections({'authors': request_object().get('authors', [])})
         return jsonify({'status': 'ok'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 400
@@ -111,10 +257,7 @@ def update_authors():
 def update_projects():
     """Update active projects."""
     try:
-        config = load_config_raw()
-        projects = request.json.get('projects', [])
-        config['active_projects'] = projects
-        save_config_raw(config)
+        update_config_sections({'projects': request_object().get('projects', [])})
         return jsonify({'status': 'ok'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 400
@@ -124,10 +267,7 @@ def update_projects():
 def update_journals():
     """Update journal weights."""
     try:
-        config = load_config_raw()
-        journals = request.json.get('journal_weights', {})
-        config['journal_weights'] = journals
-        save_config_raw(config)
+        update_config_sections({'journal_weights': request_object().get('journal_weights', {})})
         return jsonify({'status': 'ok'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 400
@@ -137,10 +277,7 @@ def update_journals():
 def update_settings():
     """Update general settings."""
     try:
-        config = load_config_raw()
-        settings = request.json.get('settings', {})
-        config['settings'] = settings
-        save_config_raw(config)
+        update_config_sections({'settings': request_object().get('settings', {})})
         return jsonify({'status': 'ok'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 400
@@ -148,12 +285,31 @@ def update_settings():
 
 @app.route('/api/stats')
 def get_stats():
-    """Get database statistics."""
+    """Get database statistics (ETag'd, so unchanged polls get a 304)."""
     try:
-        db = PaperDatabase(DATA_PATH)
+        body = _stats_body()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    response = app.response_class(body, mimetype='application/json')
+    response.cache_control.max_age = STATS_CACHE_SECONDS
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def _stats_body() -> bytes:
+    """Serialize the stats payload, reusing it for STATS_CACHE_SECONDS."""
+    global _stats_cache
+    # Held while querying, so simultaneous polls share one set of queries
+    with _stats_lock:
+        now = time.monotonic()
+        if _stats_cache is not None and now - _stats_cache[0] < STATS_CACHE_SECONDS:
+            return _stats_cache[1]
+
+        db = get_db()
         stats = db.get_stats()
         runs = db.get_search_runs(limit=5)
-        return jsonify({
+        body = fastjson.dumps({
             'stats': stats,
             'recent_runs': [
                 {
@@ -164,14 +320,14 @@ def get_stats():
                 for r in runs
             ]
         })
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        _stats_cache = (now, body)
+        return body
 
 
 @app.route('/papers')
 def papers():
     """Paper feedback page."""
-    db = PaperDatabase(DATA_PATH)
+    db = get_db()
 
     # Get filter params
     feedback_filter = request.args.get('filter', 'all')
@@ -213,7 +369,7 @@ def set_feedback():
         if feedback and feedback not in ('star', 'dismiss'):
             return jsonify({'status': 'error', 'message': 'feedback must be star, dismiss, or null'}), 400
 
-        db = PaperDatabase(DATA_PATH)
+        db = get_db()
         db.set_feedback(paper_id, feedback)
         return jsonify({'status': 'ok'})
     except Exception as e:
@@ -223,7 +379,7 @@ def set_feedback():
 @app.route('/seeds')
 def seeds():
     """Seed papers page."""
-    db = PaperDatabase(DATA_PATH)
+    db = get_db()
     seed_list = db.get_seed_papers()
     return render_template('seeds.html', seeds=seed_list)
 
@@ -239,12 +395,12 @@ def add_seed():
             return jsonify({'status': 'error', 'message': 'identifier required'}), 400
 
         from src.paper_lookup import lookup_paper
-        paper, source = lookup_paper(identifier)
+        db = get_db()
+        paper, source = lookup_paper(identifier, db=db)
 
         if not paper:
             return jsonify({'status': 'error', 'message': f'Could not find paper for: {identifier}'}), 404
 
-        db = PaperDatabase(DATA_PATH)
         is_new = db.insert_seed_paper(paper, source=source)
 
         return jsonify({
@@ -259,7 +415,7 @@ def add_seed():
 @app.route('/suggestions')
 def suggestions():
     """Config suggestions page."""
-    db = PaperDatabase(DATA_PATH)
+    db = get_db()
     pending = db.get_pending_suggestions()
     all_suggestions = db.get_all_suggestions()
     resolved = [s for s in all_suggestions if s.status != 'pending']
@@ -277,7 +433,7 @@ def resolve_suggestion():
         if not suggestion_id or status not in ('accepted', 'dismissed'):
             return jsonify({'status': 'error', 'message': 'id and status (accepted/dismissed) required'}), 400
 
-        db = PaperDatabase(DATA_PATH)
+        db = get_db()
 
         if status == 'accepted':
             # Get the suggestion to auto-apply
@@ -345,14 +501,70 @@ def test_config():
         return jsonify({'status': 'error', 'message': str(e)}), 400
 
 
+# gunicorn settings for `python -m web.app`. One process keeps the in-process
+# caches and config write lock authoritative; its threads overlap requests.
+GUNICORN_OPTIONS = {
+    'bind': '0.0.0.0:5000',
+    'workers': 1,
+    'worker_class': 'gthread',
+    'threads': 4,
+}
+
+
+def serve():
+    """Serve the app with gunicorn when it's installed, else Flask's built-in server."""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        app.run(host='0.0.0.0', port=5000, threaded=True)
+        return
+
+    class StandaloneApplication(BaseApplication):
+        def load_config(self):
+            for key, value in GUNICORN_OPTIONS.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    StandaloneApplication().run()
+
+
+def local_ip_address(timeout: float = 0.5) -> str:
+    """
+    Best-effort LAN IPv4 address for the startup banner.
+
+    Never blocks on a slow resolver: a misconfigured /etc/hosts or DNS on
+    the Pi used to stall startup for seconds in gethostbyname.
+    """
+    # Connecting a UDP socket sends nothing, but picks the outgoing interface
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.connect(('10.255.255.255', 1))
+            return sock.getsockname()[0]
+    except OSError:
+        pass
+
+    # No route (e.g. offline): resolve our own hostname, but only briefly
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(
+            socket.getaddrinfo, socket.gethostname(), None,
+            socket.AF_INET, socket.SOCK_STREAM,
+        )
+        return future.result(timeout=timeout)[0][4][0]
+    except (OSError, FutureTimeoutError):
+        return '127.0.0.1'
+    finally:
+        executor.shutdown(wait=False)
+
+
 if __name__ == '__main__':
-    import socket
-    hostname = socket.gethostname()
-    local_ip = socket.gethostbyname(hostname)
+    local_ip = local_ip_address()
 
     print(f"Config file: {CONFIG_PATH}")
     print(f"Database: {DATA_PATH}")
     print(f"\nStarting web UI...")
     print(f"  Local:   http://localhost:5000")
     print(f"  Network: http://{local_ip}:5000")
-    app.run(host='0.0.0.0', port=5000)
+    serve()